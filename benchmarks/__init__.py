@@ -0,0 +1,18 @@
+"""
+Performance benchmarks for the static site generator.
+
+Run a benchmark as a module from the repository root, e.g.:
+
+    python3 -m benchmarks.run --pages 500 --output results.json
+
+benchmarks.corpus generates the synthetic sites the benchmarks run on.
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+
+# The generator's modules import each other by bare name, as test.sh runs them
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
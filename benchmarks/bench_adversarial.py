@@ -0,0 +1,98 @@
+"""
+Worst-case inline parsing: times text_to_textnodes and the split_nodes
+pipeline on hostile inputs at doubling sizes and fails if any of them
+grows faster than near-linearly.
+
+    python3 -m benchmarks.bench_adversarial --size 8000 --doublings 3
+"""
+import argparse
+import gc
+import sys
+import time
+
+from block_markdown import markdown_to_html_node
+from inline_markdown import multipass_text_to_textnodes, text_to_textnodes
+
+# Each case builds an input of roughly n repetitions of its pattern
+CASES = {
+    "links": lambda n: "see [a](/b) " * n,
+    "images": lambda n: "see ![a](/b.png) " * n,
+    "links and images": lambda n: "[a](/b)![c](/d)" * n,
+    "star run": lambda n: "*" * (4 * n),
+    "odd star run": lambda n: "*" * (4 * n + 1),
+    "underscore run": lambda n: "_" * (4 * n),
+    "alternating delimiters": lambda n: "*_`" * n,
+    "open brackets": lambda n: "[" * (4 * n),
+    "unclosed links": lambda n: "[a](" * n,
+    "unclosed images": lambda n: "![a](b" * n,
+    "nested brackets": lambda n: "[" * n + "a" + "]" * n + "(" * n + ")" * n,
+    "repeated brackets": lambda n: "[[]](())" * n,
+}
+
+PARSERS = {
+    "text_to_textnodes": text_to_textnodes,
+    "split pipeline": multipass_text_to_textnodes,
+    "markdown_to_html_node": markdown_to_html_node,
+}
+
+
+def best_time(func, text, repeat):
+    timings = []
+    # Collections triggered by the parsers' allocations would swamp the
+    # growth being measured
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                func(text)
+            except ValueError:
+                # Unclosed delimiters are rejected; rejecting them must be linear too
+                pass
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def growth(func, make_text, size, doublings, repeat):
+    """
+    Time func at size, 2 * size, ... and return the timings and how much the
+    time grows per doubling on average: about 2 for linear time, 4 for
+    quadratic.
+    """
+    timings = [
+        best_time(func, make_text(size * 2 ** i), repeat) for i in range(doublings + 1)
+    ]
+    ratio = (timings[-1] / max(timings[0], 1e-9)) ** (1 / doublings)
+    return timings, ratio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=8000)
+    parser.add_argument("--doublings", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-ratio", type=float, default=2.5,
+        help="Largest time ratio allowed when the input doubles",
+    )
+    args = parser.parse_args()
+
+    print(f"{'case':<24}{'parser':<24}{'largest (ms)':>14}{'ratio':>8}")
+    failures = []
+    for case, make_text in CASES.items():
+        for name, func in PARSERS.items():
+            timings, ratio = growth(func, make_text, args.size, args.doublings, args.repeat)
+            flag = "" if ratio <= args.max_ratio else "  SUPER-LINEAR"
+            print(f"{case:<24}{name:<24}{timings[-1] * 1e3:>14.2f}{ratio:>8.2f}{flag}")
+            if flag:
+                failures.append(f"{name} on {case}")
+
+    if failures:
+        sys.exit(f"Super-linear scaling: {', '.join(failures)}")
+    print(f"All cases within {args.max_ratio:.1f}x per doubling")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Inline parsing: the original six-pass split pipeline versus the
+single-pass text_to_textnodes scanner, over paragraph-heavy input.
+
+    python3 -m benchmarks.bench_inline --paragraphs 2000
+"""
+import argparse
+import random
+import time
+
+from benchmarks import corpus
+from inline_markdown import multipass_text_to_textnodes, text_to_textnodes
+
+
+def best_of(repeat, func, paragraphs):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            func(paragraph)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    paragraphs = [corpus.make_inline(rng, args.words) for _ in range(args.paragraphs)]
+    for paragraph in paragraphs:
+        assert text_to_textnodes(paragraph) == multipass_text_to_textnodes(paragraph)
+
+    before = best_of(args.repeat, multipass_text_to_textnodes, paragraphs)
+    after = best_of(args.repeat, text_to_textnodes, paragraphs)
+    total_chars = sum(len(p) for p in paragraphs)
+
+    print(f"paragraphs: {len(paragraphs)} ({total_chars} chars)")
+    print(f"six-pass pipeline:   {before / len(paragraphs) * 1e6:8.2f} us/paragraph")
+    print(f"single-pass scanner: {after / len(paragraphs) * 1e6:8.2f} us/paragraph")
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Memory use of the node classes: bytes per node for each class, compared
+with an equivalent __dict__-based instance, and peak memory while parsing
+a large document with markdown_to_html_node.
+
+    python3 -m benchmarks.bench_memory --blocks 20000
+"""
+import argparse
+import tracemalloc
+
+from benchmarks import corpus
+from block_markdown import markdown_to_html_node
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+# Subclasses without __slots__ get a per-instance __dict__ again,
+# which is what every node carried before the classes were slotted
+class DictTextNode(TextNode):
+    pass
+
+
+class DictLeafNode(LeafNode):
+    pass
+
+
+class DictParentNode(ParentNode):
+    pass
+
+
+def bytes_per_instance(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Exclude the list holding them (one pointer per instance)
+    return (after - before) / len(instances) - 8
+
+
+def count_nodes(node):
+    count = 1
+    for child in node.children or ():
+        count += count_nodes(child)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=20_000)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Shared field values, so only the node objects themselves are measured
+    text, children, props = "x", [], {"href": "/"}
+    factories = [
+        ("TextNode", lambda i: TextNode(text, TextType.TEXT), lambda i: DictTextNode(text, TextType.TEXT)),
+        ("LeafNode", lambda i: LeafNode("a", text, props), lambda i: DictLeafNode("a", text, props)),
+        ("ParentNode", lambda i: ParentNode("p", children), lambda i: DictParentNode("p", children)),
+    ]
+    print(f"{'class':<12}{'slots B/node':>14}{'__dict__ B/node':>18}")
+    for name, slotted, dict_based in factories:
+        print(
+            f"{name:<12}{bytes_per_instance(slotted, args.count):>14.1f}"
+            f"{bytes_per_instance(dict_based, args.count):>18.1f}"
+        )
+
+    markdown = corpus.make_document(args.blocks)
+    tracemalloc.start()
+    node = markdown_to_html_node(markdown)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(node)
+    print()
+    print(f"document: {len(markdown) / 1e6:.1f} MB of markdown, {nodes} HTML nodes")
+    print(f"tree size: {current / 1e6:.1f} MB ({current / nodes:.0f} B/node incl. strings)")
+    print(f"peak while parsing: {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
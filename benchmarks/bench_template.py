@@ -0,0 +1,77 @@
+"""
+Per-page template cost: rendering the content, re-reading template.html and
+running four str.replace passes over the page, versus a template compiled
+once per build that rewrites URLs on the nodes as they render.
+
+    python3 -m benchmarks.bench_template --pages 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks import corpus
+from block_markdown import markdown_to_html_node, extract_title
+from main import discover_pages
+from template import load_template
+
+
+def render_pages(content_dir):
+    """Parse every page up front so only rendering and the template step are timed."""
+    rendered = []
+    for src_path, _ in discover_pages(content_dir, ""):
+        with open(src_path, 'r') as f:
+            markdown = f.read()
+        rendered.append((extract_title(markdown), markdown_to_html_node(markdown)))
+    return rendered
+
+
+def template_per_page(template_path, rendered, basepath):
+    """The pre-compilation template step, as generate_page used to run it."""
+    for title, html_node in rendered:
+        with open(template_path, 'r') as f:
+            template_content = f.read()
+        final_html = template_content.replace("{{ Title }}", title)
+        final_html = final_html.replace("{{ Content }}", html_node.to_html())
+        final_html = final_html.replace('href="/', f'href="{basepath}')
+        final_html = final_html.replace('src="/', f'src="{basepath}')
+
+
+def template_compiled(template_path, rendered, basepath):
+    template = load_template(template_path, basepath)
+    for title, html_node in rendered:
+        template.render(title, html_node)
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--basepath", default="/static-site-generator/")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as site:
+        corpus.generate_site(site, args.pages)
+        template_path = os.path.join(site, "template.html")
+        rendered = render_pages(os.path.join(site, "content"))
+
+        before = best_of(args.repeat, template_per_page, template_path, rendered, args.basepath)
+        after = best_of(args.repeat, template_compiled, template_path, rendered, args.basepath)
+
+    print(f"pages: {len(rendered)}")
+    print(f"per-page template (read + 4 replaces): {before / len(rendered) * 1e6:8.2f} us")
+    print(f"compiled template (URL hook):         {after / len(rendered) * 1e6:8.2f} us")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Deterministic synthetic site generator for benchmarks.
+
+A generated site mirrors the repo's layout (content/, static/,
+template.html) with pages that mix the same constructs as content/blog/*:
+headings, paragraphs with inline formatting, lists, quotes, code blocks,
+links and images. The same parameters and seed always produce the same
+bytes.
+
+    python3 -m benchmarks.corpus /tmp/site --pages 1000 --depth 3
+"""
+import argparse
+import os
+import random
+import shutil
+import struct
+import zlib
+
+from benchmarks import REPO_ROOT
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog while elves sing in rivendell "
+    "and hobbits keep their second breakfast close at hand near old forest "
+    "where tom bombadil wanders singing of river daughters and barrow wights"
+).split()
+
+IMAGE_COUNT = 8
+
+
+def make_inline(rng, words, link_targets=("/",)):
+    """A run of words sprinkled with every inline construct."""
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.04:
+            word = f"**{word}**"
+        elif roll < 0.08:
+            word = f"_{word}_"
+        elif roll < 0.10:
+            word = f"`{word}`"
+        elif roll < 0.12:
+            word = f"[{word}]({rng.choice(link_targets)})"
+        elif roll < 0.13:
+            word = f"![{word}](/images/img{rng.randrange(IMAGE_COUNT)}.png)"
+        parts.append(word)
+    return " ".join(parts)
+
+
+def make_block(rng, link_targets):
+    roll = rng.random()
+    if roll < 0.12:
+        level = rng.randint(2, 4)
+        return "#" * level + " " + make_inline(rng, rng.randint(2, 6), link_targets)
+    if roll < 0.22:
+        items = rng.randint(2, 8)
+        marker = rng.choice("-*")
+        return "\n".join(
+            f"{marker} {make_inline(rng, rng.randint(4, 16), link_targets)}" for _ in range(items)
+        )
+    if roll < 0.30:
+        items = rng.randint(2, 8)
+        return "\n".join(
+            f"{i}. {make_inline(rng, rng.randint(4, 16), link_targets)}" for i in range(1, items + 1)
+        )
+    if roll < 0.36:
+        lines = rng.randint(1, 4)
+        return "\n".join(f"> {make_inline(rng, rng.randint(6, 20), link_targets)}" for _ in range(lines))
+    if roll < 0.42:
+        lines = [f"print({rng.choice(WORDS)!r})" for _ in range(rng.randint(2, 10))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    lines = rng.randint(1, 4)
+    return "\n".join(make_inline(rng, rng.randint(20, 60), link_targets) for _ in range(lines))
+
+
+def make_page(rng, title, blocks, link_targets=("/",)):
+    """Markdown for one page: an h1 title followed by `blocks` random blocks."""
+    parts = [f"# {title}", "[< Back Home](/)"]
+    parts.extend(make_block(rng, link_targets) for _ in range(blocks))
+    return "\n\n".join(parts) + "\n"
+
+
+def make_document(blocks, seed=0):
+    """A single large markdown document with `blocks` blocks."""
+    rng = random.Random(seed)
+    return make_page(rng, "Large document", blocks)
+
+
+def page_dirs(pages, depth):
+    """Relative directory of each page, nested `depth` sections deep."""
+    dirs = []
+    for i in range(pages):
+        sections = [f"section{(i // (8 ** level)) % 8}" for level in range(depth)]
+        dirs.append(os.path.join(*sections, f"page{i}"))
+    return dirs
+
+
+def make_png(width, height, seed):
+    """A small, valid RGB PNG with a deterministic pattern."""
+    rows = []
+    for y in range(height):
+        row = bytearray([0])
+        for x in range(width):
+            row += bytes(((x * seed) & 255, (y * 3) & 255, ((x ^ y) + seed) & 255))
+        rows.append(bytes(row))
+    raw = b"".join(rows)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+    )
+
+
+def generate_site(root, pages=100, depth=2, blocks=30, seed=0):
+    """
+    Write a synthetic site under root: content/, static/ and template.html.
+    Returns the paths of the generated markdown files.
+    """
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+
+    dirs = page_dirs(pages, depth)
+    link_targets = ["/"] + ["/" + d.replace(os.sep, "/") + "/" for d in dirs]
+
+    paths = []
+    for i, rel_dir in enumerate(dirs):
+        path = os.path.join(content_dir, rel_dir, "index.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(make_page(rng, f"Page {i}", blocks, link_targets))
+        paths.append(path)
+    with open(os.path.join(content_dir, "index.md"), "w") as f:
+        f.write(make_page(rng, "Home", blocks, link_targets))
+    paths.append(os.path.join(content_dir, "index.md"))
+
+    os.makedirs(os.path.join(static_dir, "images"), exist_ok=True)
+    shutil.copy(os.path.join(REPO_ROOT, "static", "index.css"), static_dir)
+    for i in range(IMAGE_COUNT):
+        with open(os.path.join(static_dir, "images", f"img{i}.png"), "wb") as f:
+            f.write(make_png(64, 64, i + 1))
+
+    shutil.copy(os.path.join(REPO_ROOT, "template.html"), root)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--blocks", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_site(args.root, args.pages, args.depth, args.blocks, args.seed)
+    print(f"Generated {len(paths)} pages under {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark runner: times the generator's main stages on a synthetic site
+and writes the results as JSON, optionally comparing against a previous run.
+
+    python3 -m benchmarks.run --pages 200 --output results.json
+    python3 -m benchmarks.run --pages 200 --compare results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus
+from assets import sync_static
+from block_markdown import BlockType, markdown_to_html_node, parse_markdown, set_inline_cache
+from build_manifest import BuildManifest
+from inline_markdown import InlineCache, text_to_textnodes
+from main import discover_pages, generate_page, generate_pages_recursive
+from template import load_template
+
+
+def measure(func, repeat):
+    """Run func `repeat` times; return timing statistics in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "runs": repeat,
+    }
+
+
+def run_benchmarks(site, repeat, jobs):
+    content_dir = os.path.join(site, "content")
+    static_dir = os.path.join(site, "static")
+    template_path = os.path.join(site, "template.html")
+
+    pages = discover_pages(content_dir, os.path.join(site, "out"))
+    markdowns = []
+    for src_path, _ in pages:
+        with open(src_path, 'r') as f:
+            markdowns.append(f.read())
+
+    # The inline text of every paragraph and list item, as the block
+    # converters pass it to text_to_textnodes
+    paragraphs = []
+    for markdown in markdowns:
+        blocks, _ = parse_markdown(markdown)
+        for block in blocks:
+            if block.block_type == BlockType.PARAGRAPH:
+                paragraphs.append(" ".join(block.lines))
+            elif block.block_type == BlockType.UNORDERED_LIST:
+                paragraphs.extend(line[2:] for line in block.lines)
+            elif block.block_type == BlockType.ORDERED_LIST:
+                paragraphs.extend(line.split(". ", 1)[1] for line in block.lines)
+    trees = [markdown_to_html_node(markdown) for markdown in markdowns]
+
+    def inline():
+        for paragraph in paragraphs:
+            text_to_textnodes(paragraph)
+
+    def parse():
+        for markdown in markdowns:
+            markdown_to_html_node(markdown)
+
+    def parse_cached():
+        set_inline_cache(InlineCache())
+        try:
+            parse()
+        finally:
+            set_inline_cache(None)
+
+    def render():
+        for tree in trees:
+            tree.to_html()
+
+    def pages_only():
+        template = load_template(template_path, "/")
+        for src_path, dest_path in pages:
+            generate_page(src_path, template_path, dest_path, "/", template=template)
+
+    def full_build():
+        dest_dir = os.path.join(site, "build")
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        manifest = BuildManifest(os.path.join(site, "manifest.json"))
+        sync_static(static_dir, dest_dir, manifest)
+        generate_pages_recursive(
+            content_dir, template_path, dest_dir, "/", manifest=manifest, jobs=jobs,
+        )
+
+    benchmarks = [
+        ("text_to_textnodes", inline, len(paragraphs)),
+        ("markdown_to_html_node", parse, len(markdowns)),
+        ("markdown_to_html_node+cache", parse_cached, len(markdowns)),
+        ("ParentNode.to_html", render, len(trees)),
+        ("generate_page", pages_only, len(pages)),
+        ("full_build", full_build, len(pages)),
+    ]
+
+    results = {}
+    for name, func, items in benchmarks:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            stats = measure(func, repeat)
+        stats["items"] = items
+        stats["per_item_us"] = stats["min"] / items * 1e6
+        results[name] = stats
+    return results
+
+
+def print_results(results, baseline=None):
+    header = f"{'benchmark':<30}{'min (ms)':>12}{'per item (us)':>16}"
+    if baseline:
+        header += f"{'vs baseline':>14}"
+    print(header)
+    for name, stats in results.items():
+        line = f"{name:<30}{stats['min'] * 1e3:>12.2f}{stats['per_item_us']:>16.2f}"
+        if baseline and name in baseline:
+            line += f"{stats['min'] / baseline[name]['min']:>13.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--blocks", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for full_build")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as site:
+        corpus.generate_site(site, args.pages, args.depth, args.blocks, args.seed)
+        results = run_benchmarks(site, args.repeat, args.jobs)
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "corpus": {
+                "pages": args.pages, "depth": args.depth,
+                "blocks": args.blocks, "seed": args.seed,
+            },
+            "jobs": args.jobs,
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import json
+import os
+import shutil
+
+from build_manifest import hash_file, write_json_atomic
+from tracing import get_tracer
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 8
+
+
+def sync_static(src_dir, dest_dir, manifest, use_hash=False, png_optimizer=None,
+                fingerprint=False):
+    """
+    Incrementally mirror the static files in src_dir into dest_dir.
+
+    A file is copied only if its output is missing or differs in size or
+    modification time (copies preserve the source mtime). With use_hash,
+    same-size files are compared by content hash instead of mtime, so a
+    touched but unchanged file is not copied again.
+
+    Outputs recorded in the manifest that this sync did not produce (their
+    source is gone, or its fingerprint changed) are removed. Anything else
+    in dest_dir, such as generated pages, is left alone.
+
+    With a png_optimizer, PNG files are written losslessly optimized
+    instead of copied. Their outputs carry the source mtime but not its
+    size, so they are compared by mtime alone.
+
+    With fingerprint, every file is published under a name carrying a hash
+    of its content (index.css becomes index.<hash>.css), so it can be served
+    with long-lived cache headers, and the mapping from original to
+    fingerprinted paths is written to asset-manifest.json in dest_dir.
+    An unchanged file keeps its name across builds.
+
+    Returns the output paths that were copied.
+    """
+    if not os.path.exists(src_dir):
+        raise ValueError(f"Source directory does not exist: {src_dir}")
+
+    os.makedirs(dest_dir, exist_ok=True)
+
+    # Turning optimization on or off changes every PNG output
+    optimize = png_optimizer is not None
+    optimize_changed = manifest.png_optimized != optimize
+
+    copied = []
+    unchanged = 0
+    outputs = []
+    assets = {}
+    for rel_path in list_files(src_dir):
+        src_path = os.path.join(src_dir, rel_path)
+        out_path = rel_path
+        if fingerprint:
+            out_path = fingerprinted_name(rel_path, hash_file(src_path))
+            assets[rel_path.replace(os.sep, "/")] = out_path.replace(os.sep, "/")
+        outputs.append(out_path)
+        dest_path = os.path.join(dest_dir, out_path)
+        is_png = rel_path.lower().endswith(".png")
+
+        if not (is_png and optimize_changed) and _is_up_to_date(
+            src_path, dest_path, use_hash, optimize and is_png
+        ):
+            unchanged += 1
+            continue
+
+        if optimize and is_png:
+            print(f"Optimizing image: {src_path} -> {dest_path}")
+            png_optimizer.optimize_file(src_path, dest_path)
+            shutil.copystat(src_path, dest_path)
+        else:
+            print(f"Copying file: {src_path} -> {dest_path}")
+            with get_tracer().span("static_copy"):
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                shutil.copy2(src_path, dest_path)
+        copied.append(dest_path)
+
+    live = set(outputs)
+    removed = [rel_path for rel_path in manifest.static_files if rel_path not in live]
+    for rel_path in removed:
+        remove_output(os.path.join(dest_dir, rel_path), dest_dir)
+    manifest.static_files = sorted(outputs)
+    manifest.png_optimized = optimize
+
+    asset_manifest_path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+    if fingerprint:
+        if load_asset_map(dest_dir) != assets:
+            write_json_atomic(asset_manifest_path, assets)
+    elif os.path.exists(asset_manifest_path):
+        os.remove(asset_manifest_path)
+
+    print(
+        f"Static assets: {len(copied)} copied, {unchanged} unchanged, "
+        f"{len(removed)} removed"
+    )
+    if optimize and png_optimizer.optimized:
+        print(
+            f"PNG optimization: saved {png_optimizer.bytes_saved} bytes "
+            f"across {png_optimizer.optimized} image(s)"
+        )
+    return copied
+
+
+def fingerprinted_name(rel_path, content_hash):
+    """Insert the start of content_hash before rel_path's extension."""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{content_hash[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def load_asset_map(dest_dir):
+    """
+    Read the asset map written by a fingerprinting sync_static into dest_dir.
+    Returns an empty dict if there is none.
+    """
+    try:
+        with open(os.path.join(dest_dir, ASSET_MANIFEST_NAME), "r") as f:
+            assets = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return assets if isinstance(assets, dict) else {}
+
+
+def list_files(root):
+    """Return the paths of all files under root, relative to root, sorted."""
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    files.sort()
+    return files
+
+
+def _is_up_to_date(src_path, dest_path, use_hash, optimized=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+
+    # An optimized output never matches its source's size or hash; a touched
+    # source is simply optimized again, which its cache makes cheap
+    if optimized:
+        return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+
+    if not use_hash:
+        return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+    if hash_file(src_path) != hash_file(dest_path):
+        return False
+    # Same content: adopt the source mtime so the cheap check passes next time
+    shutil.copystat(src_path, dest_path)
+    return True
+
+
+def remove_output(dest_path, dest_root):
+    """
+    Delete a generated file and any directories it leaves empty,
+    stopping at dest_root.
+    """
+    if os.path.exists(dest_path):
+        print(f"Removing stale output: {dest_path}")
+        os.remove(dest_path)
+
+    parent = os.path.dirname(dest_path)
+    dest_root = os.path.abspath(dest_root)
+    while parent and os.path.abspath(parent) != dest_root:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
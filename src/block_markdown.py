@@ -15,43 +15,239 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+
+
+class Block:
+    """
+    A markdown block: its BlockType plus its lines, already split and with
+    the block's surrounding whitespace stripped.
+    """
+
+    __slots__ = ("block_type", "lines")
+
+    def __init__(self, block_type, lines):
+        self.block_type = block_type
+        self.lines = lines
+
+    def __eq__(self, other):
+        return self.block_type == other.block_type and self.lines == other.lines
+
+    def __repr__(self):
+        return f"Block({getattr(self.block_type, 'value', self.block_type)}, {self.lines})"
+
+
 def block_to_block_type(block):
     """
     Determine the type of a markdown block.
     Returns a BlockType enum value.
     """
-    lines = block.split("\n")
-    
-    # Check for heading (1-6 # followed by space)
-    if re.match(r"^#{1,6} ", block):
-        return BlockType.HEADING
-    
-    # Check for code block (starts and ends with ```)
-    if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
-    
-    # Check for quote block (every line starts with "> ")
-    if all(line.startswith("> ") for line in lines):
-        return BlockType.QUOTE
-    
-    # Check for unordered list (every line starts with "- " or "* ")
-    if all(line.startswith("- ") or line.startswith("* ") for line in lines):
-        return BlockType.UNORDERED_LIST
-    
-    # Check for ordered list (lines start with "1. ", "2. ", etc.)
-    is_ordered_list = True
-    for i, line in enumerate(lines, start=1):
-        if not line.startswith(f"{i}. "):
-            is_ordered_list = False
-            break
-    
-    if is_ordered_list:
-        return BlockType.ORDERED_LIST
-    
-    # Default to paragraph
+    return lines_to_block_type(block.split("\n"))
+
+
+def lines_to_block_type(lines):
+    """
+    Determine the type of a block from its lines.
+    Only the handlers registered for the first line's leading character
+    are asked, so classifying a block is a dictionary lookup plus the
+    checks of the few types that can start with that character.
+    """
+    for handler in _handlers_by_lead.get(lines[0][:1], ()):
+        if handler.matches(lines):
+            return handler.block_type
     return BlockType.PARAGRAPH
 
 
+class BlockHandler:
+    """
+    How one type of block is recognized and converted to HTML.
+
+    block_type is a BlockType for the built-in types, and any other
+    hashable name (usually a string) for custom ones. leads holds the
+    characters a block of this type can start with: a block is only
+    offered to the handlers of its first character. matches(lines) returns
+    True if a block's lines are of this type, and to_html_node(lines)
+    converts them to an HTMLNode.
+    """
+
+    __slots__ = ("block_type", "leads", "matches", "to_html_node")
+
+    def __init__(self, block_type, leads, matches, to_html_node):
+        self.block_type = block_type
+        self.leads = leads
+        self.matches = matches
+        self.to_html_node = to_html_node
+
+    def __repr__(self):
+        return f"BlockHandler({self.block_type}, {self.leads!r})"
+
+
+# Leading character -> handlers to try, most recently registered first
+_handlers_by_lead = {}
+# Block type -> its handler
+_handlers_by_type = {}
+_builtin_handlers = []
+
+
+def register_block_handler(handler):
+    """
+    Add a block type, or replace the handler of an existing one.
+
+    Handlers sharing a leading character are tried from the most recently
+    registered, so a custom type can claim blocks a built-in type would
+    otherwise match. Blocks no handler matches are paragraphs.
+    """
+    unregister_block_handler(handler.block_type)
+    _handlers_by_type[handler.block_type] = handler
+    for lead in handler.leads:
+        _handlers_by_lead.setdefault(lead, []).insert(0, handler)
+
+
+def unregister_block_handler(block_type):
+    """Remove the handler of block_type, if any; its blocks become paragraphs."""
+    handler = _handlers_by_type.pop(block_type, None)
+    if handler is None:
+        return
+    for lead in handler.leads:
+        handlers = _handlers_by_lead[lead]
+        handlers.remove(handler)
+        if not handlers:
+            del _handlers_by_lead[lead]
+
+
+def custom_block_handlers():
+    """
+    Describe every registered handler that is not a built-in one, in a
+    form that can be saved and compared, so output rendered with a
+    different set of handlers is recognized as stale.
+    """
+    return [
+        f"{getattr(handler.block_type, 'value', handler.block_type)}:"
+        f"{handler.to_html_node.__module__}.{handler.to_html_node.__qualname__}"
+        for handler in _handlers_by_type.values()
+        if handler not in _builtin_handlers
+    ]
+
+
+def _is_heading(lines):
+    # 1-6 # followed by space
+    return HEADING_PATTERN.match(lines[0]) is not None
+
+
+def _is_code(lines):
+    # Starts and ends with ```
+    return lines[0].startswith("```") and lines[-1].endswith("```")
+
+
+def _is_quote(lines):
+    # Every line starts with "> "
+    return all(line.startswith("> ") for line in lines)
+
+
+def _is_unordered_list(lines):
+    # Every line starts with "- " or "* "
+    return all(line.startswith("- ") or line.startswith("* ") for line in lines)
+
+
+def _is_ordered_list(lines):
+    # Lines start with "1. ", "2. ", etc.
+    return all(line.startswith(f"{i}. ") for i, line in enumerate(lines, start=1))
+
+
+class BlockScanner:
+    """
+    Single pass over the lines of a markdown document.
+
+    scan() yields a typed Block as soon as each block ends (at an empty
+    line or the end of input) and, in the same pass, records the first
+    h1 line as the document's title.
+    """
+
+    def __init__(self):
+        self.title = None
+
+    def scan(self, lines):
+        block_lines = []
+        for line in lines:
+            if self.title is None and "# " in line:
+                self.title = _title_from_line(line)
+
+            if line == "":
+                if block_lines:
+                    block = _finish_block(block_lines)
+                    if block is not None:
+                        yield block
+                    block_lines = []
+                continue
+
+            block_lines.append(line)
+
+        if block_lines:
+            block = _finish_block(block_lines)
+            if block is not None:
+                yield block
+
+
+def _finish_block(lines):
+    """
+    Strip the block's surrounding whitespace as markdown_to_blocks does
+    and classify it. Returns None for a whitespace-only block.
+    """
+    start = 0
+    end = len(lines)
+    while start < end and lines[start].strip() == "":
+        start += 1
+    while end > start and lines[end - 1].strip() == "":
+        end -= 1
+    if start == end:
+        return None
+
+    lines = lines[start:end]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return Block(lines_to_block_type(lines), lines)
+
+
+def _title_from_line(line):
+    """Return the h1 title on a line, or None if it is not an h1 line."""
+    line = line.strip()
+    if line.startswith("# "):
+        return line[2:].strip()
+    return None
+
+
+def find_title(lines):
+    """
+    Return the first h1's text among lines, or None.
+    Stops consuming lines at the title, so a stream is read no further.
+    """
+    for line in lines:
+        if "# " in line:
+            title = _title_from_line(line)
+            if title is not None:
+                return title
+    return None
+
+
+def read_lines(f):
+    """
+    Yield the lines of a text file opened with universal newlines, without
+    their line endings: the same lines parse_markdown splits a document into.
+    """
+    for line in f:
+        yield line[:-1] if line.endswith("\n") else line
+
+
+def parse_markdown(markdown):
+    """
+    Parse a markdown document into typed blocks in a single pass.
+    Returns (blocks, title), where title is the first h1's text or None.
+    """
+    scanner = BlockScanner()
+    blocks = list(scanner.scan(markdown.split("\n")))
+    return blocks, scanner.title
+
+
 def markdown_to_blocks(markdown):
     """
     Split a markdown document into block strings.
@@ -70,11 +266,33 @@ def markdown_to_blocks(markdown):
     return filtered_blocks
 
 
+_inline_cache = None
+
+
+def set_inline_cache(cache):
+    """
+    Memoize text_to_children through an InlineCache, or stop if cache is None.
+    While a cache is set, text_to_children returns shared tuples of nodes.
+    """
+    global _inline_cache
+    _inline_cache = cache
+
+
+def get_inline_cache():
+    return _inline_cache
+
+
 def text_to_children(text):
     """
     Convert inline markdown text to a list of HTMLNode children.
     This handles bold, italic, code, links, and images.
     """
+    if _inline_cache is not None:
+        return _inline_cache.lookup(text, _text_to_children)
+    return _text_to_children(text)
+
+
+def _text_to_children(text):
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
@@ -83,16 +301,17 @@ def text_to_children(text):
     return children
 
 
-def paragraph_to_html_node(block):
-    """Convert a paragraph block to an HTMLNode."""
-    lines = block.split("\n")
+def paragraph_to_html_node(lines):
+    """Convert a paragraph block's lines to an HTMLNode."""
     paragraph_text = " ".join(lines)
     children = text_to_children(paragraph_text)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
-    """Convert a heading block to an HTMLNode."""
+def heading_to_html_node(lines):
+    """Convert a heading block's lines to an HTMLNode."""
+    block = "\n".join(lines)
+
     # Count the number of # characters
     level = 0
     for char in block:
@@ -110,8 +329,10 @@ def heading_to_html_node(block):
     return ParentNode(f"h{level}", children)
 
 
-def code_to_html_node(block):
-    """Convert a code block to an HTMLNode."""
+def code_to_html_node(lines):
+    """Convert a code block's lines to an HTMLNode."""
+    block = "\n".join(lines)
+
     # Remove the opening and closing ```
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("Invalid code block")
@@ -124,10 +345,8 @@ def code_to_html_node(block):
     return ParentNode("pre", [code_node])
 
 
-def quote_to_html_node(block):
-    """Convert a quote block to an HTMLNode."""
-    lines = block.split("\n")
-
+def quote_to_html_node(lines):
+    """Convert a quote block's lines to an HTMLNode."""
     # Remove "> " from the start of each line
     new_lines = []
     for line in lines:
@@ -141,9 +360,8 @@ def quote_to_html_node(block):
     return ParentNode("blockquote", children)
 
 
-def unordered_list_to_html_node(block):
-    """Convert an unordered list block to an HTMLNode."""
-    lines = block.split("\n")
+def unordered_list_to_html_node(lines):
+    """Convert an unordered list block's lines to an HTMLNode."""
     list_items = []
 
     for line in lines:
@@ -161,9 +379,8 @@ def unordered_list_to_html_node(block):
     return ParentNode("ul", list_items)
 
 
-def ordered_list_to_html_node(block):
-    """Convert an ordered list block to an HTMLNode."""
-    lines = block.split("\n")
+def ordered_list_to_html_node(lines):
+    """Convert an ordered list block's lines to an HTMLNode."""
     list_items = []
 
     for i, line in enumerate(lines, start=1):
@@ -183,28 +400,69 @@ def markdown_to_html_node(markdown):
     Convert a full markdown document to an HTMLNode.
     Returns a parent div containing all block-level elements.
     """
-    blocks = markdown_to_blocks(markdown)
-    children = []
+    blocks, _ = parse_markdown(markdown)
+    return blocks_to_html_node(blocks)
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
-
-        if block_type == BlockType.PARAGRAPH:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == BlockType.HEADING:
-            children.append(heading_to_html_node(block))
-        elif block_type == BlockType.CODE:
-            children.append(code_to_html_node(block))
-        elif block_type == BlockType.QUOTE:
-            children.append(quote_to_html_node(block))
-        elif block_type == BlockType.UNORDERED_LIST:
-            children.append(unordered_list_to_html_node(block))
-        elif block_type == BlockType.ORDERED_LIST:
-            children.append(ordered_list_to_html_node(block))
-        else:
-            raise ValueError(f"Unknown block type: {block_type}")
 
-    return ParentNode("div", children)
+def blocks_to_html_node(blocks):
+    """
+    Convert parsed Blocks to an HTMLNode.
+    Returns a parent div containing all block-level elements.
+    """
+    return ParentNode("div", [block_to_html_node(block) for block in blocks])
+
+
+def block_to_html_node(block):
+    """Convert one parsed Block to an HTMLNode through its type's handler."""
+    handler = _handlers_by_type.get(block.block_type)
+    if handler is None:
+        raise ValueError(f"Unknown block type: {block.block_type}")
+    return handler.to_html_node(block.lines)
+
+
+# Paragraphs are the fallback for blocks no other handler matches, so
+# their handler has no leading characters
+for _handler in (
+    BlockHandler(BlockType.PARAGRAPH, "", None, paragraph_to_html_node),
+    BlockHandler(BlockType.HEADING, "#", _is_heading, heading_to_html_node),
+    BlockHandler(BlockType.CODE, "`", _is_code, code_to_html_node),
+    BlockHandler(BlockType.QUOTE, ">", _is_quote, quote_to_html_node),
+    BlockHandler(BlockType.UNORDERED_LIST, "-*", _is_unordered_list, unordered_list_to_html_node),
+    BlockHandler(BlockType.ORDERED_LIST, "1", _is_ordered_list, ordered_list_to_html_node),
+):
+    register_block_handler(_handler)
+    _builtin_handlers.append(_handler)
+del _handler
+
+
+class StreamedDocument:
+    """
+    A document rendered block by block as its Blocks arrive, for pages too
+    large to hold whole: each block is converted to nodes, written and
+    dropped before the next is parsed, so memory is bounded by the largest
+    block. Renders like the <div> blocks_to_html_node would build, so it can
+    be handed to Template.write; it can only be rendered once.
+
+    on_node, if given, is called with each block's HTMLNode after it is
+    written (e.g. to collect search terms).
+    """
+
+    def __init__(self, blocks, on_node=None):
+        self.blocks = blocks
+        self.on_node = on_node
+
+    def write_html(self, write, rewrite_url=None, minifier=None):
+        write("<div>")
+        for block in self.blocks:
+            node = block_to_html_node(block)
+            node.write_html(write, rewrite_url, minifier)
+            if self.on_node is not None:
+                self.on_node(node)
+        write("</div>")
+
+    def __repr__(self):
+        return f"StreamedDocument({self.blocks})"
+
 
 def extract_title(markdown):
     """
@@ -212,12 +470,7 @@ def extract_title(markdown):
     Returns the title text without the # prefix.
     Raises ValueError if no h1 header is found.
     """
-    lines = markdown.split("\n")
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith("# "):
-            # Remove the "# " prefix and return
-            return line[2:].strip()
-
-    raise ValueError("No h1 header found in markdown")
+    title = find_title(markdown.split("\n"))
+    if title is None:
+        raise ValueError("No h1 header found in markdown")
+    return title
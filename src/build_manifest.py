@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+
+from output_writer import write_if_changed
+
+# Bump whenever a change to the generator alters the HTML it produces,
+# so that pages built by an older generator are never treated as current.
+GENERATOR_VERSION = "2"
+
+
+def hash_file(path):
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path, data):
+    """
+    Write data as JSON to path via write_if_changed, which writes to a
+    temporary file of its own and renames it, so readers never see a
+    half-written file and concurrent writers of the same path cannot clash.
+    """
+    write_if_changed(path, json.dumps(data, indent=1, sort_keys=True))
+
+
+class BuildManifest:
+    """
+    Records the inputs of the previous build so the next one can skip
+    pages whose inputs have not changed.
+
+    Each page entry maps a source markdown path to the hash of that source
+    and the output path it was rendered to. Template hash, basepath,
+    fingerprinted asset names, minification, custom block handlers and
+    generator version are global inputs: if any differ, every page is stale.
+
+    static_files lists the static outputs (relative to the output directory)
+    written by the last sync, so outputs of deleted assets can be removed.
+    png_optimized records whether PNG outputs were optimized, and
+    compressed maps each output with a .gz sidecar to the hash it was
+    compressed from, and site_indexes lists the sitemap and feed files
+    written by the last build.
+    """
+
+    def __init__(self, path, generator_version=None, template_hash=None,
+                 basepath=None, pages=None, static_files=None, png_optimized=False,
+                 assets=None, compressed=None, minify=False, site_indexes=None,
+                 block_handlers=None):
+        self.path = path
+        self.generator_version = generator_version
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self.pages = pages if pages is not None else {}
+        self.static_files = static_files if static_files is not None else []
+        self.png_optimized = png_optimized
+        self.assets = assets if assets is not None else {}
+        self.compressed = compressed if compressed is not None else {}
+        self.minify = minify
+        self.site_indexes = site_indexes if site_indexes is not None else []
+        self.block_handlers = block_handlers if block_handlers is not None else []
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a manifest from disk.
+        A missing or unreadable manifest yields an empty one (full rebuild).
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict):
+            return cls(path)
+
+        return cls(
+            path,
+            generator_version=data.get("generator_version"),
+            template_hash=data.get("template_hash"),
+            basepath=data.get("basepath"),
+            pages=data.get("pages", {}),
+            static_files=data.get("static_files", []),
+            png_optimized=data.get("png_optimized", False),
+            assets=data.get("assets", {}),
+            compressed=data.get("compressed", {}),
+            minify=data.get("minify", False),
+            site_indexes=data.get("site_indexes", []),
+            block_handlers=data.get("block_handlers", []),
+        )
+
+    def save(self):
+        write_json_atomic(self.path, {
+            "generator_version": self.generator_version,
+            "template_hash": self.template_hash,
+            "basepath": self.basepath,
+            "pages": self.pages,
+            "static_files": self.static_files,
+            "png_optimized": self.png_optimized,
+            "assets": self.assets,
+            "compressed": self.compressed,
+            "minify": self.minify,
+            "site_indexes": self.site_indexes,
+            "block_handlers": self.block_handlers,
+        })
+
+    def set_global_inputs(self, template_hash, basepath, assets=None, minify=False,
+                          block_handlers=None):
+        """
+        Record the inputs shared by every page.
+
+        If any of them changed since the last build, every page is marked
+        stale by clearing its source hash. The entries themselves are kept,
+        so prune_pages still finds the outputs of sources removed since.
+        """
+        assets = assets if assets is not None else {}
+        block_handlers = block_handlers if block_handlers is not None else []
+        if (
+            self.generator_version != GENERATOR_VERSION
+            or self.template_hash != template_hash
+            or self.basepath != basepath
+            or self.assets != assets
+            or self.minify != minify
+            or self.block_handlers != block_handlers
+        ):
+            for entry in self.pages.values():
+                entry["hash"] = None
+
+        self.generator_version = GENERATOR_VERSION
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self.assets = assets
+        self.minify = minify
+        self.block_handlers = block_handlers
+
+    def is_page_current(self, source_path, source_hash, dest_path):
+        """Return True if source_path was already rendered to dest_path from source_hash."""
+        entry = self.pages.get(source_path)
+        if entry is None:
+            return False
+        return (
+            entry.get("hash") == source_hash
+            and entry.get("output") == dest_path
+            and os.path.exists(dest_path)
+        )
+
+    def record_page(self, source_path, source_hash, dest_path, title=None, links=None):
+        entry = {"hash": source_hash, "output": dest_path}
+        if title is not None:
+            entry["title"] = title
+        if links is not None:
+            entry["links"] = links
+        self.pages[source_path] = entry
+
+    def forget_page(self, source_path):
+        self.pages.pop(source_path, None)
+
+    def prune_pages(self, live_sources):
+        """
+        Forget pages whose source is no longer present.
+        Returns the output paths of the removed pages.
+        """
+        removed_outputs = []
+        for source_path in list(self.pages):
+            if source_path not in live_sources:
+                removed_outputs.append(self.pages.pop(source_path)["output"])
+        return removed_outputs
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from assets import list_files, remove_output
+from output_writer import write_if_changed
+from tracing import get_tracer
+
+# Outputs worth precompressing; binary formats such as PNG are already compressed
+TEXT_EXTENSIONS = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml", ".csv", ".map"}
+
+DEFAULT_MIN_SIZE = 1024
+
+
+def gzip_bytes(data):
+    """
+    Compress data at the highest gzip level. The header's timestamp is
+    zeroed so the same input always produces the same sidecar.
+    """
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_outputs(dest_dir, manifest, min_size=DEFAULT_MIN_SIZE, threads=None):
+    """
+    Write a .gz sidecar next to every text output in dest_dir, covering
+    generated pages and static files alike, so a server can send
+    precompressed responses.
+
+    Files are read, hashed and compressed on a thread pool (zlib releases
+    the GIL). A file whose content hash matches the one recorded in the
+    manifest and whose sidecar exists is skipped. Files smaller than
+    min_size bytes get no sidecar, and sidecars of outputs that are gone
+    or fell under the threshold are removed.
+    """
+    previous = manifest.compressed
+    paths = [
+        rel_path for rel_path in list_files(dest_dir)
+        if os.path.splitext(rel_path)[1] in TEXT_EXTENSIONS
+    ]
+
+    def compress(rel_path):
+        path = os.path.join(dest_dir, rel_path)
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < min_size:
+            return None, False
+        digest = hashlib.sha256(data).hexdigest()
+        if previous.get(rel_path) == digest and os.path.exists(f"{path}.gz"):
+            return digest, False
+        with get_tracer().span("gzip", path):
+            write_if_changed(f"{path}.gz", gzip_bytes(data))
+        return digest, True
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(compress, paths))
+
+    compressed = {}
+    written = 0
+    for rel_path, (digest, was_written) in zip(paths, results):
+        if digest is not None:
+            compressed[rel_path] = digest
+            written += was_written
+
+    removed = remove_compressed(dest_dir, previous, keep=compressed)
+    manifest.compressed = compressed
+    print(
+        f"Compressed outputs: {written} written, {len(compressed) - written} unchanged, "
+        f"{removed} removed"
+    )
+
+
+def remove_compressed(dest_dir, compressed, keep=()):
+    """
+    Delete the sidecars of the outputs in compressed that are not in keep.
+    Returns the number of sidecars removed.
+    """
+    removed = 0
+    for rel_path in compressed:
+        if rel_path in keep:
+            continue
+        sidecar = os.path.join(dest_dir, f"{rel_path}.gz")
+        if os.path.exists(sidecar):
+            removed += 1
+        # Also clears directories left empty once a removed page's sidecar is gone
+        remove_output(sidecar, dest_dir)
+    return removed
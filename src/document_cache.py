@@ -0,0 +1,213 @@
+import json
+import os
+
+from block_markdown import custom_block_handlers
+from build_manifest import write_json_atomic
+from minify import Minifier
+
+# Bump whenever a change to the markdown parser alters the content HTML
+# or title it produces, so documents parsed by an older parser are re-parsed.
+PARSER_VERSION = "2"
+
+# Stands in for each URL while a document is rendered for the cache.
+# NUL cannot appear in valid HTML, so it never collides with content.
+URL_MARKER = "\x00"
+
+
+class CachedDocument:
+    """
+    A page's content HTML as stored in the cache: static HTML parts
+    interleaved with the URLs of its href and src props, which are left
+    unresolved so they can be rewritten for any basepath.
+
+    A minified document's parts are already minified, except that its URL
+    attributes keep their quotes until the URLs are known; saved is the
+    number of bytes minifying the parts saved. terms holds the page's
+    search terms when they were recorded with it, or None.
+
+    Renders like an HTMLNode, so it can be handed to Template.write.
+    """
+
+    __slots__ = ("parts", "urls", "saved", "terms")
+
+    def __init__(self, parts, urls, saved=0, terms=None):
+        if len(parts) != len(urls) + 1:
+            raise ValueError("CachedDocument must have exactly one more part than URLs")
+        self.parts = parts
+        self.urls = urls
+        self.saved = saved
+        self.terms = terms
+
+    @classmethod
+    def from_node(cls, html_node, minify=False):
+        """
+        Render html_node, minified if minify is set, into a CachedDocument.
+        Returns None if its content contains the URL marker.
+        """
+        urls = []
+
+        def record_url(url):
+            urls.append(url)
+            return URL_MARKER
+
+        minifier = Minifier() if minify else None
+        parts = html_node.to_html(record_url, minifier).split(URL_MARKER)
+        if len(parts) != len(urls) + 1:
+            return None
+        return cls(parts, urls, minifier.saved if minify else 0)
+
+    def to_html(self, rewrite_url=None, minifier=None):
+        parts = []
+        self.write_html(parts.append, rewrite_url, minifier)
+        return "".join(parts)
+
+    def write_html(self, write, rewrite_url=None, minifier=None):
+        """
+        Write the document, filling in its URLs. With a minifier, the
+        document's saved bytes are added to it and the quotes around each
+        URL are dropped where the URL allows.
+        """
+        if minifier is not None:
+            minifier.saved += self.saved
+
+        previous = self.parts[0]
+        for url, part in zip(self.urls, self.parts[1:]):
+            if rewrite_url is not None:
+                url = rewrite_url(url)
+            if (
+                minifier is not None
+                and previous.endswith('="')
+                and part.startswith('"')
+                and minifier.can_unquote(url)
+            ):
+                previous, part = previous[:-1], part[1:]
+                minifier.saved += 2
+            write(previous)
+            write(url)
+            previous = part
+        write(previous)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CachedDocument)
+            and self.parts == other.parts
+            and self.urls == other.urls
+            and self.saved == other.saved
+        )
+
+    def __repr__(self):
+        return f"CachedDocument({self.parts}, {self.urls}, {self.saved})"
+
+
+class DocumentCache:
+    """
+    An on-disk cache of parsed documents, so a page whose markdown has not
+    changed can skip parsing and only be re-run through the template.
+
+    Each entry is one JSON file, named after the SHA-256 of the markdown
+    source, holding the parser version, the page title and its content as
+    a CachedDocument. URLs are stored unresolved and rewritten at render
+    time, so an entry stays valid when only the template, the basepath or
+    asset fingerprints change. Minified documents are cached separately,
+    as "<hash>.min.json".
+
+    Entries are written atomically, and anything unreadable, written by a
+    different parser version or recorded for a different hash is treated
+    as a miss and overwritten, so an interrupted build can never make the
+    cache serve bad content.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, source_hash, minify=False):
+        return os.path.join(self.directory, _entry_name(source_hash, minify))
+
+    def get(self, source_hash, minify=False, terms=False):
+        """
+        Return the cached (title, CachedDocument) for source_hash, or None.
+        With minify, the minified form of the document is looked up. With
+        terms, an entry cached without search terms is a miss.
+        """
+        try:
+            with open(self._entry_path(source_hash, minify), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or entry.get("parser_version") != PARSER_VERSION
+            or entry.get("block_handlers", []) != custom_block_handlers()
+            or entry.get("hash") != source_hash
+            or not isinstance(entry.get("title"), str)
+            or not _is_str_list(entry.get("parts"))
+            or not _is_str_list(entry.get("urls"))
+            or len(entry["parts"]) != len(entry["urls"]) + 1
+            or not isinstance(entry.get("saved"), int)
+            or not (entry.get("terms") is None or _is_str_list(entry["terms"]))
+            or (terms and entry.get("terms") is None)
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["title"], CachedDocument(
+            entry["parts"], entry["urls"], entry["saved"], entry.get("terms")
+        )
+
+    def put(self, source_hash, title, html_node, minify=False, terms=None):
+        """
+        Cache the parsed html_node of a document, minified if minify is set,
+        along with its search terms if given.
+        Returns the CachedDocument stored, or None if it could not be cached.
+        """
+        document = CachedDocument.from_node(html_node, minify)
+        if document is None:
+            return None
+        document.terms = terms
+        write_json_atomic(self._entry_path(source_hash, minify), {
+            "parser_version": PARSER_VERSION,
+            "block_handlers": custom_block_handlers(),
+            "hash": source_hash,
+            "title": title,
+            "parts": document.parts,
+            "urls": document.urls,
+            "saved": document.saved,
+            "terms": terms,
+        })
+        return document
+
+    def prune(self, live_hashes):
+        """
+        Delete entries whose hash is not in live_hashes, along with any
+        temporary files left behind by an interrupted write.
+        Returns the number of files removed.
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+
+        removed = 0
+        for name in os.listdir(self.directory):
+            source_hash = name.split(".", 1)[0]
+            if source_hash in live_hashes and name in (
+                _entry_name(source_hash, False), _entry_name(source_hash, True)
+            ):
+                continue
+            os.remove(os.path.join(self.directory, name))
+            removed += 1
+        return removed
+
+    def __repr__(self):
+        return f"DocumentCache({self.directory}, hits={self.hits}, misses={self.misses})"
+
+
+def _entry_name(source_hash, minify):
+    return f"{source_hash}.min.json" if minify else f"{source_hash}.json"
+
+
+def _is_str_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
@@ -1,20 +1,73 @@
+import inspect
+
+# Props holding URLs, which rendering passes through the rewrite_url hook
+URL_PROPS = ("href", "src")
+
+
+def _accepts_hooks(to_html):
+    """Return True if a to_html method can be called with rewrite_url and minifier."""
+    try:
+        inspect.signature(to_html).bind(None, None, None)
+    except TypeError:
+        return False
+    return True
+
+
 class HTMLNode:
+    # Pages build tens of thousands of nodes; slots keep each one small
+    __slots__ = ("tag", "value", "children", "props")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
     
-    def to_html(self):
+    # Whether this class's to_html takes the rewrite_url and minifier hooks
+    _to_html_takes_hooks = True
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._to_html_takes_hooks = _accepts_hooks(cls.to_html)
+        # An inherited fast-path write_html would bypass an overridden to_html
+        if "to_html" in cls.__dict__ and "write_html" not in cls.__dict__:
+            cls.write_html = HTMLNode.write_html
+    
+    def to_html(self, rewrite_url=None, minifier=None):
         raise NotImplementedError("to_html method not implemented")
     
-    def props_to_html(self):
+    def write_html(self, write, rewrite_url=None, minifier=None):
+        """
+        Render this node by passing its HTML, in order, to the write callable
+        (e.g. list.append or a text stream's write).
+        
+        rewrite_url, if given, is applied to the value of every href and src
+        prop as it is rendered (e.g. to prefix a basepath); text is untouched.
+        
+        minifier, if given, is a minify.Minifier that text, attributes and end
+        tags are rendered through, producing minified HTML.
+        
+        This is the method custom nodes override to support the hooks. A
+        subclass that only defines to_html(self) is rendered through it
+        as is: its URLs are not rewritten and its HTML is not minified.
+        """
+        if (rewrite_url is None and minifier is None) or not self._to_html_takes_hooks:
+            write(self.to_html())
+        else:
+            write(self.to_html(rewrite_url, minifier))
+    
+    def props_to_html(self, rewrite_url=None, minifier=None):
         if self.props is None:
             return ""
         
         html_attrs = []
         for key, value in self.props.items():
-            html_attrs.append(f'{key}="{value}"')
+            if rewrite_url is not None and key in URL_PROPS:
+                value = rewrite_url(value)
+            if minifier is None:
+                html_attrs.append(f'{key}="{value}"')
+            else:
+                html_attrs.append(minifier.attribute(key, value))
         
         return " " + " ".join(html_attrs) if html_attrs else ""
     
@@ -22,37 +75,65 @@ class HTMLNode:
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
-    def to_html(self):
+    def to_html(self, rewrite_url=None, minifier=None):
         if self.value is None:
             raise ValueError("All leaf nodes must have a value")
         
-        if self.tag is None:
-            return self.value
+        if minifier is None:
+            if self.tag is None:
+                return self.value
+            props = "" if self.props is None else self.props_to_html(rewrite_url)
+            return f"<{self.tag}{props}>{self.value}</{self.tag}>"
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        value = minifier.text(self.value)
+        if self.tag is None:
+            return value
+        return f"<{self.tag}{self.props_to_html(rewrite_url, minifier)}>{value}{minifier.end_tag(self.tag)}"
+    
+    def write_html(self, write, rewrite_url=None, minifier=None):
+        """
+        Render straight to write, skipping the hook dispatch in
+        HTMLNode.write_html: leaves are most of a page's nodes.
+        """
+        write(self.to_html(rewrite_url, minifier))
     
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
     
-    def to_html(self):
+    def to_html(self, rewrite_url=None, minifier=None):
+        parts = []
+        self.write_html(parts.append, rewrite_url, minifier)
+        return "".join(parts)
+    
+    def write_html(self, write, rewrite_url=None, minifier=None):
+        """
+        Stream the subtree to write one tag or leaf at a time, so rendering
+        is linear in the output size however deeply the tree is nested.
+        """
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         
         if self.children is None:
             raise ValueError("ParentNode must have children")
         
-        children_html = ""
+        props = "" if self.props is None else self.props_to_html(rewrite_url, minifier)
+        write(f"<{self.tag}{props}>")
+        # Whitespace inside a <pre> is significant, so its content is not minified
+        child_minifier = None if self.tag == "pre" else minifier
         for child in self.children:
-            children_html += child.to_html()
-        
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+            child.write_html(write, rewrite_url, child_minifier)
+        write(f"</{self.tag}>" if minifier is None else minifier.end_tag(self.tag))
     
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
@@ -1,4 +1,7 @@
 import re
+import sys
+from collections import OrderedDict
+
 from textnode import TextNode, TextType
 
 
@@ -32,15 +35,21 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# Both patterns match in linear time: each repeated class stops at the
+# bracket that ends it, so a failed match only backtracks over the run of
+# text before the next bracket, and each run follows a single "[" or "(".
+
+
 def extract_markdown_images(text):
     """
     Extract markdown images from text.
     Returns list of tuples: (alt_text, url)
     Pattern: ![alt text](url)
     """
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
@@ -49,15 +58,31 @@ def extract_markdown_links(text):
     Returns list of tuples: (anchor_text, url)
     Pattern: [text](url) but NOT ![text](url)
     """
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
+
 
 def split_nodes_image(old_nodes):
     """
     Split TEXT nodes containing markdown images into separate nodes.
     Images become IMAGE type nodes, surrounding text stays TEXT type.
     """
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
+
+def split_nodes_link(old_nodes):
+    """
+    Split TEXT nodes containing markdown links into separate nodes.
+    Links become LINK type nodes, surrounding text stays TEXT type.
+    """
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    """
+    Split TEXT nodes at each match of pattern, whose groups are a node's
+    text and URL. The text between matches is sliced by the matches' spans,
+    so each node is scanned once, however many matches it holds.
+    """
     new_nodes = []
 
     for old_node in old_nodes:
@@ -66,109 +91,175 @@ def split_nodes_image(old_nodes):
             new_nodes.append(old_node)
             continue
 
-        # Extract all images from this node
-        images = extract_markdown_images(old_node.text)
-
-        # If no images, keep the node as-is
-        if not images:
+        text = old_node.text
+        position = 0
+        for match in pattern.finditer(text):
+            # Add the text before the match (if not empty)
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+
+        # Keep a node without matches as-is, or add the text after the last match
+        if position == 0:
             new_nodes.append(old_node)
-            continue
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
 
-        # Process the text, splitting by each image
-        remaining_text = old_node.text
-
-        for alt_text, url in images:
-            # Construct the full markdown syntax to split on
-            markdown_image = f"![{alt_text}]({url})"
-
-            # Split on this image (max 1 split to handle same image multiple times)
-            parts = remaining_text.split(markdown_image, 1)
-
-            if len(parts) != 2:
-                raise ValueError(f"Image markdown '{markdown_image}' not found in text")
-
-            # Add the text before the image (if not empty)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-
-            # Add the image node
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
+    return new_nodes
 
-            # Continue with the remaining text
-            remaining_text = parts[1]
+def multipass_text_to_textnodes(text):
+    """
+    The original six-pass pipeline: split_nodes_image, split_nodes_link,
+    then split_nodes_delimiter once per delimiter. Kept as the reference
+    implementation text_to_textnodes is tested and benchmarked against.
+    """
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
 
-        # Add any remaining text after the last image
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
 
-    return new_nodes
+# Inline delimiters in the order the multi-pass pipeline applied them.
+# A delimiter's index in this tuple is its nesting level.
+DELIMITERS = (
+    ("**", TextType.BOLD),
+    ("*", TextType.ITALIC),
+    ("_", TextType.ITALIC),
+    ("`", TextType.CODE),
+)
 
 
-def split_nodes_link(old_nodes):
-    """
-    Split TEXT nodes containing markdown links into separate nodes.
-    Links become LINK type nodes, surrounding text stays TEXT type.
+def text_to_textnodes(text):
     """
-    new_nodes = []
+    Convert raw markdown text to a list of TextNode objects.
+    Handles all inline markdown: images, links, bold, italic, and code.
 
-    for old_node in old_nodes:
-        # Only split TEXT type nodes
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
+    Emits the same nodes as running split_nodes_image, split_nodes_link and
+    split_nodes_delimiter for "**", "*", "_" and "`" in turn, but in one
+    left-to-right walk: images and links are taken straight from their regex
+    matches, and the text between them is split on each delimiter depth first,
+    so no node list is built per pass and nothing is re-split per match.
+    """
+    nodes = []
+    failed_levels = []
+
+    position = 0
+    for image in IMAGE_PATTERN.finditer(text):
+        _scan_links(text, position, image.start(), nodes, failed_levels)
+        nodes.append(TextNode(image.group(1), TextType.IMAGE, image.group(2)))
+        position = image.end()
+    _scan_links(text, position, len(text), nodes, failed_levels)
+
+    # The multi-pass pipeline stopped at the first pass with an unclosed
+    # delimiter, so report the outermost level that failed
+    if failed_levels:
+        delimiter = DELIMITERS[min(failed_levels)][0]
+        raise ValueError(f"Invalid markdown: unclosed delimiter '{delimiter}'")
 
-        # Extract all links from this node
-        links = extract_markdown_links(old_node.text)
+    return nodes
 
-        # If no links, keep the node as-is
-        if not links:
-            new_nodes.append(old_node)
-            continue
 
-        # Process the text, splitting by each link
-        remaining_text = old_node.text
+def _scan_links(text, start, end, nodes, failed_levels):
+    """Emit nodes for text[start:end], which contains no images."""
+    position = start
+    for link in LINK_PATTERN.finditer(text, start, end):
+        _scan_delimiters(text, position, link.start(), nodes, failed_levels)
+        nodes.append(TextNode(link.group(1), TextType.LINK, link.group(2)))
+        position = link.end()
+    _scan_delimiters(text, position, end, nodes, failed_levels)
 
-        for anchor_text, url in links:
-            # Construct the full markdown syntax to split on
-            markdown_link = f"[{anchor_text}]({url})"
 
-            # Split on this link (max 1 split to handle same link multiple times)
-            parts = remaining_text.split(markdown_link, 1)
+def _scan_delimiters(text, start, end, nodes, failed_levels):
+    """Emit nodes for text[start:end], which contains no images or links."""
+    if start < end:
+        _split_delimited(text[start:end], 0, nodes, failed_levels)
 
-            if len(parts) != 2:
-                raise ValueError(f"Link markdown '{markdown_link}' not found in text")
 
-            # Add the text before the link (if not empty)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
+def _split_delimited(text, level, nodes, failed_levels):
+    """
+    Split text on the delimiter of the given level. Delimited sections
+    become nodes of that level's type; the text between them is split on
+    the next level down, depth first, so no intermediate node lists are built.
+    """
+    while level < len(DELIMITERS) and DELIMITERS[level][0] not in text:
+        level += 1
 
-            # Add the link node
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
+    if level == len(DELIMITERS):
+        nodes.append(TextNode(text, TextType.TEXT))
+        return
 
-            # Continue with the remaining text
-            remaining_text = parts[1]
+    delimiter, text_type = DELIMITERS[level]
+    sections = text.split(delimiter)
+    if len(sections) % 2 == 0:
+        failed_levels.append(level)
+        return
 
-        # Add any remaining text after the last link
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+    for i, section in enumerate(sections):
+        if section == "":
+            continue
+        if i % 2 == 0:
+            _split_delimited(section, level + 1, nodes, failed_levels)
+        else:
+            nodes.append(TextNode(section, text_type))
 
-    return new_nodes
 
-def text_to_textnodes(text):
+class InlineCache:
     """
-    Convert raw markdown text to a list of TextNode objects.
-    Handles all inline markdown: images, links, bold, italic, and code.
+    Bounded LRU cache of parsed inline fragments, keyed by the fragment text.
+
+    Repeated fragments (boilerplate sentences, list items, bylines) cost a
+    dictionary lookup instead of a parse. Values are stored as tuples and
+    shared between every caller that asks for the same text, so callers
+    must not mutate the nodes they get back.
+
+    The cache holds at most max_entries fragments and roughly max_bytes of
+    keys and nodes; the least recently used fragments are evicted first.
     """
-    # Start with a single TEXT node containing all the text
-    nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Process in order: images and links first, then delimiters
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
-    return nodes
 
+    # Rough size of a node object, its string header and its tuple slot
+    NODE_OVERHEAD = 120
+
+    def __init__(self, max_entries=65536, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+
+    def lookup(self, text, parse):
+        """
+        Return the cached nodes for text, or parse(text) them, cache them
+        as a tuple and return that.
+        """
+        entry = self._entries.get(text)
+        if entry is not None:
+            self._entries.move_to_end(text)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        nodes = tuple(parse(text))
+        # The nodes' strings are slices of text, so count its size twice
+        size = 2 * sys.getsizeof(text) + self.NODE_OVERHEAD * len(nodes)
+        if size <= self.max_bytes:
+            self._entries[text] = (nodes, size)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+        return nodes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"InlineCache({len(self._entries)} entries, {self.size_bytes} bytes, "
+            f"{self.hits} hits, {self.misses} misses)"
+        )
@@ -0,0 +1,99 @@
+import os
+import posixpath
+import re
+from urllib.parse import unquote
+
+from assets import list_files
+from document_cache import CachedDocument
+from htmlnode import URL_PROPS
+
+# URLs with a scheme (https:, mailto:, ...) or protocol-relative URLs
+EXTERNAL_URL_PATTERN = re.compile(r"(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)")
+
+
+def page_links(html_node):
+    """
+    Return the href and src URLs of a page's content, as written in the
+    markdown, from its HTML node tree or CachedDocument.
+    """
+    if isinstance(html_node, CachedDocument):
+        return list(html_node.urls)
+
+    links = []
+    stack = [html_node]
+    while stack:
+        node = stack.pop()
+        if node.props:
+            links.extend(value for key, value in node.props.items() if key in URL_PROPS)
+        if node.children:
+            stack.extend(reversed(node.children))
+    return links
+
+
+def build_path_index(page_paths, dest_dir, static_dir=None):
+    """
+    Return the set of every path the build publishes, relative to the site
+    root with "/" separators: the pages' output paths (under dest_dir) and
+    the files of static_dir, by the names content links to them with.
+    """
+    paths = set(
+        os.path.relpath(dest_path, dest_dir).replace(os.sep, "/") for dest_path in page_paths
+    )
+    if static_dir is not None and os.path.isdir(static_dir):
+        paths.update(rel_path.replace(os.sep, "/") for rel_path in list_files(static_dir))
+    return paths
+
+
+def resolve_link(url, page_path):
+    """
+    Resolve a URL from the page published at page_path (relative to the
+    site root) to the site path it points at. Returns None for external
+    URLs and same-page fragments, which are not checked.
+
+    Root-relative URLs are resolved against the site root, as they are
+    written in the markdown: the basepath is only added when pages are
+    rendered, so a link that already includes it does not resolve.
+    """
+    if EXTERNAL_URL_PATTERN.match(url):
+        return None
+    path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+    if not path:
+        return None
+    if path.startswith("/"):
+        target = path[1:]
+    else:
+        target = posixpath.join(posixpath.dirname(page_path), path)
+    normalized = posixpath.normpath(target) if target else ""
+    if normalized == ".":
+        normalized = ""
+    if target.endswith("/") and normalized:
+        normalized += "/"
+    return normalized
+
+
+def is_published(path, path_index):
+    """
+    Return True if a server would find path among path_index: the file
+    itself, a directory's index.html, or the page's .html file.
+    """
+    if path.endswith("/") or not path:
+        return f"{path}index.html" in path_index
+    return (
+        path in path_index
+        or f"{path}/index.html" in path_index
+        or f"{path}.html" in path_index
+    )
+
+
+def find_broken_links(page_path, links, path_index):
+    """
+    Return the links of the page at page_path that point at no published
+    path. Each check is a set lookup, so a whole site is checked in time
+    linear in its number of links.
+    """
+    broken = []
+    for url in links:
+        path = resolve_link(url, page_path)
+        if path is not None and not is_published(path, path_index):
+            broken.append(url)
+    return broken
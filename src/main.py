@@ -1,48 +1,65 @@
+import argparse
+import hashlib
+import importlib
 import os
 import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from block_markdown import markdown_to_html_node, extract_title
+from assets import load_asset_map, sync_static, remove_output
+from block_markdown import (
+    BlockScanner, StreamedDocument, parse_markdown, blocks_to_html_node, find_title,
+    custom_block_handlers, get_inline_cache, read_lines, set_inline_cache,
+)
+from build_manifest import BuildManifest, hash_file
+from compress import DEFAULT_MIN_SIZE, compress_outputs, remove_compressed
+from document_cache import DocumentCache
+from inline_markdown import InlineCache
+from link_check import build_path_index, find_broken_links, page_links
+from output_writer import OutputWriter, StreamedFile
+from png_optimize import PngOptimizer
+from search_index import SearchIndex, page_terms, tokenize
+from sitemap import SitePage, page_url, write_feed, write_sitemap
+from template import load_template
+from tracing import enable_tracing, format_summary, get_tracer, write_chrome_trace
+from watch import Watcher
 
+MANIFEST_PATH = os.path.join(".build-cache", "manifest.json")
+DOCUMENT_CACHE_DIR = os.path.join(".build-cache", "documents")
+PNG_CACHE_DIR = os.path.join(".build-cache", "png")
+SEARCH_INDEX_PATH = os.path.join(".build-cache", "search.json")
 
-def copy_static_to_public(src_dir="static", dest_dir="docs"):
-    """
-    Recursively copy all contents from src_dir to dest_dir.
-    Deletes dest_dir first to ensure a clean copy.
-    """
-    if os.path.exists(dest_dir):
-        print(f"Deleting {dest_dir} directory...")
-        shutil.rmtree(dest_dir)
-    
-    print(f"Creating {dest_dir} directory...")
-    os.mkdir(dest_dir)
-    
-    _copy_directory_contents(src_dir, dest_dir)
+# Modules imported by load_plugins, so worker processes can import them too
+_plugins = []
 
 
-def _copy_directory_contents(src, dest):
+def load_plugins(modules):
     """
-    Helper function to recursively copy directory contents.
+    Import plugin modules by name. A plugin registers its block handlers
+    with block_markdown.register_block_handler when it is imported.
     """
-    if not os.path.exists(src):
-        raise ValueError(f"Source directory does not exist: {src}")
-    
-    items = os.listdir(src)
-    
-    for item in items:
-        src_path = os.path.join(src, item)
-        dest_path = os.path.join(dest, item)
-        
-        if os.path.isfile(src_path):
-            print(f"Copying file: {src_path} -> {dest_path}")
-            shutil.copy(src_path, dest_path)
-        else:
-            print(f"Creating directory: {dest_path}")
-            os.mkdir(dest_path)
-            _copy_directory_contents(src_path, dest_path)
+    for module in modules:
+        importlib.import_module(module)
+        if module not in _plugins:
+            _plugins.append(module)
+
+
+class RenderedPage:
+    """What generate_page learned about a page while generating it."""
 
+    __slots__ = ("title", "bytes_saved", "terms", "links")
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+    def __init__(self, title, bytes_saved=0, terms=None, links=None):
+        self.title = title
+        self.bytes_saved = bytes_saved
+        self.terms = terms
+        self.links = links
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", template=None,
+                  document_cache=None, writer=None, index_terms=False, collect_links=False,
+                  stream_threshold=None):
     """
     Generate an HTML page from markdown using a template.
     
@@ -51,55 +68,163 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
         template_path: Path to HTML template file
         dest_path: Path to write generated HTML file
         basepath: Base path for URLs (e.g., "/" or "/repo-name/")
+        template: Optional Template already compiled from template_path
+            for basepath; loaded from template_path when omitted
+        document_cache: Optional DocumentCache. When it holds the parsed
+            content of this exact markdown, parsing is skipped and only the
+            template is filled in; otherwise the parse result is stored in it.
+        writer: Optional OutputWriter to hand the page to. A threaded
+            writer queues the page's HTML; otherwise (and when omitted) the
+            page is streamed straight to dest_path as it renders
+        index_terms: Collect the page's search terms (from the parsed
+            nodes, or from the document cache)
+        collect_links: Collect the href and src URLs of the page's content
+        stream_threshold: Optional size in bytes; markdown files at least
+            this large are streamed (see _stream_page) instead of being
+            read and parsed whole
+    
+    Returns a RenderedPage with the page's title, the number of bytes
+    minification saved on it (0 unless template minifies) and, with
+    index_terms and collect_links, its search terms and link URLs.
     """
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    tracer = get_tracer()
+    
+    if template is None:
+        template = load_template(template_path, basepath)
     
-    # Read markdown file
-    with open(from_path, 'r') as f:
-        markdown_content = f.read()
+    if stream_threshold is not None and os.path.getsize(from_path) >= stream_threshold:
+        return _stream_page(
+            from_path, dest_path, template,
+            writer=writer, index_terms=index_terms, collect_links=collect_links,
+        )
     
-    # Read template file
-    with open(template_path, 'r') as f:
-        template_content = f.read()
+    # Read markdown file. The raw bytes are hashed as the document cache
+    # key, matching the manifest's hash_file(); newlines are normalized as
+    # text mode would.
+    with tracer.span("read", from_path):
+        with open(from_path, 'rb') as f:
+            markdown_bytes = f.read()
+        markdown_content = markdown_bytes.decode().replace("\r\n", "\n").replace("\r", "\n")
     
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    cached = None
+    if document_cache is not None:
+        source_hash = hashlib.sha256(markdown_bytes).hexdigest()
+        cached = document_cache.get(source_hash, template.minify, index_terms)
     
-    # Extract title
-    title = extract_title(markdown_content)
+    terms = None
+    if cached is not None:
+        title, html_node = cached
+        terms = html_node.terms
+    else:
+        # Parse blocks and find the title in a single pass over the lines
+        with tracer.span("parse_blocks", from_path):
+            blocks, title = parse_markdown(markdown_content)
+        
+        # Convert the blocks to an HTML node tree (inline markdown is parsed here)
+        with tracer.span("parse_inline", from_path):
+            html_node = blocks_to_html_node(blocks)
+        
+        if title is None:
+            raise ValueError("No h1 header found in markdown")
+        
+        if index_terms:
+            with tracer.span("index", from_path):
+                terms = page_terms(title, html_node)
+        
+        # Caching renders the tree once; the page is then filled from the
+        # cached form, which only has to splice in the rewritten URLs
+        if document_cache is not None:
+            with tracer.span("render", from_path):
+                document = document_cache.put(source_hash, title, html_node, template.minify, terms)
+            if document is not None:
+                html_node = document
+    
+    # Fill in the template (rewriting URLs and minifying as the content
+    # renders) and write the page unless the file on disk already holds
+    # the same bytes.
+    if writer is not None and writer.threads > 0:
+        # A threaded writer gets the page as one string, so the write can be
+        # queued while the next page renders: overlapping disk I/O costs
+        # holding each page's HTML until it is written.
+        with tracer.span("render", from_path):
+            parts = []
+            saved = template.write(parts.append, title, html_node)
+            html = "".join(parts)
+        writer.write(dest_path, html, from_path)
+    else:
+        # Written directly, the page is streamed to a temporary file as it
+        # renders and never held whole
+        out = StreamedFile(dest_path)
+        try:
+            with tracer.span("render", from_path):
+                saved = template.write(out.write, title, html_node)
+        except BaseException:
+            out.close(discard=True)
+            raise
+        with tracer.span("write", from_path):
+            out.close()
+        if writer is not None:
+            writer.count(out.written)
+    if template.minify:
+        print(f"Minified {dest_path}: saved {saved} bytes")
+    
+    return RenderedPage(title, saved, terms, page_links(html_node) if collect_links else None)
+
+
+def _stream_page(from_path, dest_path, template, writer=None, index_terms=False, collect_links=False):
+    """
+    Generate a page without ever holding its whole markdown or HTML: the
+    title is found by reading up to the first h1, then the file is read
+    again line by line, and each block is parsed, rendered through the
+    template and written to a temporary file as soon as it is complete.
+    Peak memory is proportional to the largest block, not the document.
+    
+    The output is identical to generate_page's. The document cache is not
+    used, since it holds whole documents; the page replaces the existing
+    file only if its content changed.
+    """
+    tracer = get_tracer()
+    with open(from_path, "r", encoding="utf-8") as f:
+        title = find_title(read_lines(f))
+    if title is None:
+        raise ValueError("No h1 header found in markdown")
     
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    terms = set(tokenize(title)) if index_terms else None
+    links = [] if collect_links else None
     
-    # Replace root-relative URLs with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
+    def collect(node):
+        if terms is not None:
+            terms.update(page_terms("", node))
+        if links is not None:
+            links.extend(page_links(node))
     
-    # Create destination directory if it doesn't exist
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    with tracer.span("stream", from_path):
+        with open(from_path, "r", encoding="utf-8") as f, StreamedFile(dest_path) as out:
+            document = StreamedDocument(
+                BlockScanner().scan(read_lines(f)),
+                collect if index_terms or collect_links else None,
+            )
+            saved = template.write(out.write, title, document)
+    if writer is not None:
+        writer.count(out.written)
+    if template.minify:
+        print(f"Minified {dest_path}: saved {saved} bytes")
     
-    # Write the generated HTML to destination
-    with open(dest_path, 'w') as f:
-        f.write(final_html)
+    return RenderedPage(title, saved, sorted(terms) if terms is not None else None, links)
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def discover_pages(dir_path_content, dest_dir_path):
     """
-    Recursively generate HTML pages from all markdown files in a directory tree.
+    Recursively find every markdown file in a content directory tree.
     
-    Args:
-        dir_path_content: Root content directory to crawl
-        template_path: Path to HTML template file
-        dest_dir_path: Root destination directory for generated HTML
-        basepath: Base path for URLs (e.g., "/" or "/repo-name/")
+    Returns a list of (source_path, dest_path) tuples, where dest_path mirrors
+    the source's location under dest_dir_path with a .html extension.
     """
     if not os.path.exists(dir_path_content):
         raise ValueError(f"Content directory does not exist: {dir_path_content}")
     
+    pages = []
     items = os.listdir(dir_path_content)
     
     for item in items:
@@ -107,34 +232,720 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
         
         if os.path.isfile(src_path):
             if item.endswith('.md'):
-                html_filename = item.replace('.md', '.html')
-                dest_path = os.path.join(dest_dir_path, html_filename)
-                generate_page(src_path, template_path, dest_path, basepath)
+                pages.append((src_path, _page_dest_path(item, dest_dir_path)))
         else:
             new_dest_dir = os.path.join(dest_dir_path, item)
-            generate_pages_recursive(src_path, template_path, new_dest_dir, basepath)
+            pages.extend(discover_pages(src_path, new_dest_dir))
+    
+    return pages
+
+
+def _page_dest_path(filename, dest_dir_path):
+    html_filename = filename.replace('.md', '.html')
+    return os.path.join(dest_dir_path, html_filename)
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, jobs=1,
+                             document_cache=None, assets=None, minify=False, site_url=None,
+                             search_index=None, check_links=False, static_dir=None,
+                             stream_threshold=None):
+    """
+    Recursively generate HTML pages from all markdown files in a directory tree.
+    
+    Every page is discovered first and then rendered, one at a time or in a
+    pool of jobs worker processes. Pages whose output file already holds
+    the same bytes are not rewritten. A failing page does not stop the others:
+    each failure is reported, and a ValueError is raised once all pages ran.
+    
+    Args:
+        dir_path_content: Root content directory to crawl
+        template_path: Path to HTML template file
+        dest_dir_path: Root destination directory for generated HTML
+        basepath: Base path for URLs (e.g., "/" or "/repo-name/")
+        manifest: Optional BuildManifest. When given, only pages whose source,
+            template, basepath, assets or generator version changed are
+            regenerated, and output for removed sources is deleted.
+        jobs: Number of worker processes to render pages with
+        document_cache: Optional DocumentCache used to skip parsing pages
+            whose markdown is unchanged. With a manifest, entries for
+            markdown that no longer exists are pruned after the build.
+        assets: Optional map from static paths to their fingerprinted names;
+            matching href and src URLs are rewritten to those names
+        minify: Render minified HTML and report the bytes it saved
+        site_url: Optional site origin (e.g. "https://example.com"). When
+            given, a sitemap of every page and an Atom feed of the pages
+            under blog/ are written to dest_dir_path.
+        search_index: Optional SearchIndex. Rendered pages are re-indexed
+            (pages it has not indexed yet are rendered even if unchanged)
+            and the index is written under dest_dir_path/search/.
+        check_links: Check every link and image URL in the pages against
+            the paths the build publishes: the pages and the files of
+            static_dir. URLs of pages that are not regenerated are taken
+            from the manifest, so no page is parsed again.
+        stream_threshold: Optional size in bytes from which markdown files
+            are streamed block by block instead of being parsed whole
+    
+    Returns the broken links found, as (source_path, url) pairs.
+    """
+    tracer = get_tracer()
+    with tracer.span("discover_pages"):
+        pages = discover_pages(dir_path_content, dest_dir_path)
+    
+    if manifest is not None:
+        manifest.set_global_inputs(
+            hash_file(template_path), basepath, assets, minify, custom_block_handlers(),
+        )
+    
+    pending = []
+    skipped = 0
+    with tracer.span("check_manifest"):
+        for src_path, dest_path in pages:
+            source_hash = None
+            if manifest is not None or search_index is not None:
+                source_hash = hash_file(src_path)
+            if (
+                manifest is not None
+                and manifest.is_page_current(src_path, source_hash, dest_path)
+                and (search_index is None or search_index.is_page_current(src_path, source_hash))
+                and (not check_links or "links" in manifest.pages[src_path])
+            ):
+                skipped += 1
+                continue
+            pending.append((src_path, dest_path, source_hash))
+    
+    template = load_template(template_path, basepath, assets, minify)
+    writer = OutputWriter()
+    with tracer.span("generate_pages"):
+        results = _run_page_jobs(
+            [(src_path, dest_path) for src_path, dest_path, _ in pending],
+            template_path, basepath, template, jobs,
+            document_cache=document_cache,
+            writer=writer,
+            index_terms=search_index is not None,
+            collect_links=check_links,
+            stream_threshold=stream_threshold,
+        )
+    print(f"Wrote {writer.written} page(s), {writer.unchanged} identical page(s) left untouched")
+    if minify:
+        saved = sum(result.bytes_saved for result in results)
+        print(f"Minified {len(results)} page(s), saving {saved} bytes")
+    
+    failed = []
+    titles = {}
+    links = {}
+    for (src_path, dest_path, source_hash), result in zip(pending, results):
+        error = result.error
+        if error is not None:
+            print(f"Error generating page {src_path}: {error}")
+            failed.append(src_path)
+        else:
+            titles[src_path] = result.title
+            links[src_path] = result.links
+            if manifest is not None:
+                manifest.record_page(src_path, source_hash, dest_path, result.title, result.links)
+            if search_index is not None:
+                url = page_url("", basepath, dest_path, dest_dir_path)
+                search_index.update_page(src_path, source_hash, url, result.title, result.terms)
+    
+    if manifest is not None:
+        live_sources = set(src_path for src_path, _ in pages)
+        for dest_path in manifest.prune_pages(live_sources):
+            remove_output(dest_path, dest_dir_path)
+        print(f"Skipped {skipped} unchanged page(s)")
+        
+        if document_cache is not None:
+            live_hashes = set(entry["hash"] for entry in manifest.pages.values())
+            live_hashes.update(source_hash for _, _, source_hash in pending)
+            document_cache.prune(live_hashes)
+        
+        for src_path, entry in manifest.pages.items():
+            titles.setdefault(src_path, entry.get("title"))
+            links.setdefault(src_path, entry.get("links"))
+    
+    failed_sources = set(failed)
+    published = [page for page in pages if page[0] not in failed_sources]
+    with tracer.span("site_indexes"):
+        update_site_indexes(
+            published, dir_path_content, dest_dir_path, basepath, site_url, titles,
+            manifest=manifest,
+        )
+    
+    broken = []
+    if check_links:
+        with tracer.span("check_links"):
+            broken = check_site_links(published, links, dest_dir_path, static_dir=static_dir)
+    
+    if search_index is not None:
+        with tracer.span("search_index"):
+            search_index.prune_pages(set(src_path for src_path, _ in pages))
+            _write_search_index(search_index, dest_dir_path)
+    
+    if failed:
+        raise ValueError(f"Failed to generate {len(failed)} page(s): {', '.join(failed)}")
+    return broken
+
+
+def update_site_indexes(pages, content_dir, dest_dir, basepath, site_url, titles, manifest=None):
+    """
+    Write the sitemap of (source_path, dest_path) pages and the Atom feed
+    of those under content_dir/blog/, streaming entries straight from the
+    page list. titles maps source paths to page titles.
+    
+    Without a site_url nothing is written. With a manifest, index files
+    from the previous build that were not written again (split sitemaps
+    of a site that shrank, or every index once site_url is dropped) are
+    removed.
+    """
+    written = []
+    if site_url is not None:
+        pages = sorted(pages, key=lambda page: page[1])
+        base_url = page_url(site_url, basepath, os.path.join(dest_dir, "index.html"), dest_dir)
+        
+        def site_pages(sources):
+            for src_path, dest_path in sources:
+                yield SitePage(
+                    page_url(site_url, basepath, dest_path, dest_dir),
+                    os.path.getmtime(src_path),
+                    titles.get(src_path),
+                )
+        
+        written.extend(write_sitemap(site_pages(pages), len(pages), dest_dir, base_url))
+        blog_dir = os.path.join(content_dir, "blog") + os.sep
+        blog_pages = [page for page in pages if page[0].startswith(blog_dir)]
+        if blog_pages:
+            feed_title = titles.get(os.path.join(content_dir, "index.md")) or base_url
+            written.append(write_feed(site_pages(blog_pages), dest_dir, base_url, feed_title))
+        print(f"Wrote {', '.join(written)} for {len(pages)} page(s)")
+    
+    if manifest is not None:
+        for name in manifest.site_indexes:
+            if name not in written:
+                remove_output(os.path.join(dest_dir, name), dest_dir)
+        manifest.site_indexes = written
+
+
+def check_site_links(pages, links, dest_dir, static_dir=None):
+    """
+    Check the links of (source_path, dest_path) pages against an index of
+    every path the site publishes: the pages and the files of static_dir.
+    links maps source paths to their pages' URLs. Each broken link is
+    reported; returns them as (source_path, url) pairs.
+    """
+    path_index = build_path_index([dest_path for _, dest_path in pages], dest_dir, static_dir)
+    broken = []
+    checked = 0
+    for src_path, dest_path in pages:
+        urls = links.get(src_path) or []
+        checked += len(urls)
+        page_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+        for url in find_broken_links(page_path, urls, path_index):
+            print(f"Broken link in {src_path}: {url}")
+            broken.append((src_path, url))
+    print(f"Checked {checked} link(s) in {len(pages)} page(s): {len(broken)} broken")
+    return broken
+
+
+def _write_search_index(search_index, dest_dir):
+    written, unchanged = search_index.write(dest_dir)
+    print(
+        f"Search index: {len(search_index.pages)} page(s), {len(search_index.shards)} shard(s); "
+        f"wrote {written} file(s), {unchanged} unchanged"
+    )
+
+
+class PageResult:
+    """
+    What a page job reports back to the build: an error description (or
+    None), the page title, the bytes minification saved, the search terms
+    and link URLs (if collected) and, from worker processes, the timing spans, inline
+    and document cache hits and misses, and write counts recorded while
+    generating the page.
+    """
+
+    __slots__ = (
+        "error", "title", "bytes_saved", "terms", "links", "spans", "cache_hits", "cache_misses",
+        "document_hits", "document_misses", "written", "unchanged",
+    )
+
+    def __init__(self, error=None, title=None, bytes_saved=0, terms=None, links=None, spans=(),
+                 cache_hits=0, cache_misses=0, document_hits=0, document_misses=0, written=0,
+                 unchanged=0):
+        self.error = error
+        self.title = title
+        self.bytes_saved = bytes_saved
+        self.terms = terms
+        self.links = links
+        self.spans = spans
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.document_hits = document_hits
+        self.document_misses = document_misses
+        self.written = written
+        self.unchanged = unchanged
+
+
+def _generate_page_job(from_path, template_path, dest_path, basepath, template,
+                       document_cache=None, writer=None, in_worker=False, index_terms=False,
+                       collect_links=False, stream_threshold=None):
+    """
+    Generate one page, reporting an error description instead of raising
+    so that a single bad page can be reported without aborting the build.
+    
+    Worker processes write their page before returning (the pool already
+    overlaps I/O with rendering), so write errors are reported with the page.
+    """
+    if in_worker:
+        writer = OutputWriter(threads=0)
+    cache = get_inline_cache()
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    if document_cache is not None:
+        document_hits, document_misses = document_cache.hits, document_cache.misses
+    
+    result = PageResult()
+    try:
+        page = generate_page(
+            from_path, template_path, dest_path, basepath,
+            template=template,
+            document_cache=document_cache,
+            writer=writer,
+            index_terms=index_terms,
+            collect_links=collect_links,
+            stream_threshold=stream_threshold,
+        )
+        result.title, result.bytes_saved = page.title, page.bytes_saved
+        result.terms, result.links = page.terms, page.links
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    
+    # Worker processes hand their measurements back to the parent
+    if in_worker:
+        result.spans = get_tracer().drain()
+        if cache is not None:
+            result.cache_hits = cache.hits - hits
+            result.cache_misses = cache.misses - misses
+        if document_cache is not None:
+            result.document_hits = document_cache.hits - document_hits
+            result.document_misses = document_cache.misses - document_misses
+        result.written = writer.written
+        result.unchanged = writer.unchanged
+    return result
+
+
+def _init_worker(tracing_enabled, inline_cache_bytes, plugins=()):
+    """Set up a pool worker's tracer, inline cache and plugins to match the parent's."""
+    load_plugins(plugins)
+    enable_tracing(tracing_enabled)
+    set_inline_cache(InlineCache(max_bytes=inline_cache_bytes) if inline_cache_bytes else None)
+
+
+def _run_page_jobs(pages, template_path, basepath, template, jobs, document_cache=None, writer=None,
+                   index_terms=False, collect_links=False, stream_threshold=None):
+    """
+    Generate (source_path, dest_path) pages, in worker processes if jobs > 1.
+    Returns one PageResult per page, in input order.
+    
+    In a serial build pages are handed to writer, whose queued writes are
+    waited for here and whose errors are reported on their page's result;
+    worker processes write their own pages and only report their counts to it.
+    """
+    if jobs <= 1 or len(pages) <= 1:
+        try:
+            results = [
+                _generate_page_job(
+                    src_path, template_path, dest_path, basepath, template,
+                    document_cache=document_cache,
+                    writer=writer,
+                    index_terms=index_terms,
+                    collect_links=collect_links,
+                    stream_threshold=stream_threshold,
+                )
+                for src_path, dest_path in pages
+            ]
+        finally:
+            write_errors = writer.close() if writer is not None else {}
+        for (_, dest_path), result in zip(pages, results):
+            if result.error is None:
+                result.error = write_errors.get(dest_path)
+        return results
+    
+    tracer = get_tracer()
+    cache = get_inline_cache()
+    initargs = (tracer.enabled, cache.max_bytes if cache is not None else 0, list(_plugins))
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=initargs
+    ) as executor:
+        futures = [
+            executor.submit(
+                _generate_page_job, src_path, template_path, dest_path, basepath, template,
+                document_cache=document_cache,
+                in_worker=True,
+                index_terms=index_terms,
+                collect_links=collect_links,
+                stream_threshold=stream_threshold,
+            )
+            for src_path, dest_path in pages
+        ]
+        results = []
+        for future in futures:
+            result = future.result()
+            tracer.extend(result.spans)
+            if cache is not None:
+                cache.hits += result.cache_hits
+                cache.misses += result.cache_misses
+            if document_cache is not None:
+                document_cache.hits += result.document_hits
+                document_cache.misses += result.document_misses
+            if writer is not None:
+                writer.written += result.written
+                writer.unchanged += result.unchanged
+            results.append(result)
+        return results
+
+
+def rebuild_changed(changed_paths, content_dir, static_dir, template_path, dest_dir,
+                    basepath, manifest, jobs=1, use_hash=False, document_cache=None,
+                    png_optimizer=None, fingerprint=False, minify=False, site_url=None,
+                    search_index=None, check_links=False, stream_threshold=None):
+    """
+    Rebuild only the outputs affected by a set of changed input paths.
+    
+    A changed or removed markdown file re-renders or deletes just its page;
+    a template change re-renders every page without touching static files;
+    static changes sync only the static assets, unless they changed an
+    asset's fingerprinted name, which re-renders every page. With a
+    site_url, the sitemap and feed are rewritten whenever pages change,
+    and a search_index is updated for just the changed pages. With
+    check_links, the site's links are checked again after any change.
+    
+    A page that fails to render is reported with its source path and keeps
+    its previous output; the other changed pages and the site indexes are
+    still updated.
+    
+    Returns a short description of what was rebuilt.
+    """
+    rebuilt = []
+    assets = manifest.assets
+    
+    static_changed = any(path.startswith(static_dir + os.sep) for path in changed_paths)
+    if static_changed:
+        copied = sync_static(static_dir, dest_dir, manifest, use_hash, png_optimizer, fingerprint)
+        rebuilt.append(f"{len(copied)} asset(s)")
+        assets = load_asset_map(dest_dir)
+    
+    if template_path in changed_paths or assets != manifest.assets:
+        generate_pages_recursive(
+            content_dir, template_path, dest_dir, basepath,
+            manifest=manifest,
+            jobs=jobs,
+            document_cache=document_cache,
+            assets=assets,
+            minify=minify,
+            site_url=site_url,
+            search_index=search_index,
+            check_links=check_links,
+            static_dir=static_dir,
+            stream_threshold=stream_threshold,
+        )
+        rebuilt.append("all pages")
+        return ", ".join(rebuilt)
+    
+    pages = sorted(
+        path for path in changed_paths
+        if path.startswith(content_dir + os.sep) and path.endswith('.md')
+    )
+    template = None
+    failed = []
+    for src_path in pages:
+        rel_dir, filename = os.path.split(os.path.relpath(src_path, content_dir))
+        dest_path = _page_dest_path(filename, os.path.join(dest_dir, rel_dir))
+        
+        if not os.path.exists(src_path):
+            manifest.forget_page(src_path)
+            if search_index is not None:
+                search_index.forget_page(src_path)
+            remove_output(dest_path, dest_dir)
+            continue
+        
+        if template is None:
+            template = load_template(template_path, basepath, assets, minify)
+        try:
+            page = generate_page(
+                src_path, template_path, dest_path, basepath,
+                template=template,
+                document_cache=document_cache,
+                index_terms=search_index is not None,
+                collect_links=check_links,
+                stream_threshold=stream_threshold,
+            )
+        except Exception as e:
+            print(f"Error generating page {src_path}: {type(e).__name__}: {e}")
+            failed.append(src_path)
+            continue
+        source_hash = hash_file(src_path)
+        manifest.record_page(src_path, source_hash, dest_path, page.title, page.links)
+        if search_index is not None:
+            url = page_url("", basepath, dest_path, dest_dir)
+            search_index.update_page(src_path, source_hash, url, page.title, page.terms)
+    if pages:
+        rebuilt.append(f"{len(pages) - len(failed)} page(s)")
+        if failed:
+            rebuilt.append(f"{len(failed)} failed page(s)")
+        if search_index is not None:
+            _write_search_index(search_index, dest_dir)
+        titles = {src_path: entry.get("title") for src_path, entry in manifest.pages.items()}
+        update_site_indexes(
+            discover_pages(content_dir, dest_dir), content_dir, dest_dir, basepath, site_url,
+            titles, manifest=manifest,
+        )
+    
+    if check_links and (pages or static_changed):
+        links = {src_path: entry.get("links") for src_path, entry in manifest.pages.items()}
+        check_site_links(
+            discover_pages(content_dir, dest_dir), links, dest_dir, static_dir=static_dir,
+        )
+    
+    return ", ".join(rebuilt) or "nothing"
+
+
+def watch(content_dir, static_dir, template_path, dest_dir, basepath, manifest,
+          jobs=1, use_hash=False, interval=0.5, document_cache=None, png_optimizer=None,
+          fingerprint=False, gzip_min_size=None, minify=False, site_url=None, search_index=None,
+          check_links=False, stream_threshold=None):
+    """
+    Poll the site's inputs forever, rebuilding what changed after each poll
+    and reporting how long each rebuild took. With gzip_min_size, .gz
+    sidecars are refreshed after each rebuild.
+    """
+    watcher = Watcher([content_dir, static_dir, template_path])
+    print(f"Watching {content_dir}/, {static_dir}/ and {template_path} for changes...")
+    
+    while True:
+        time.sleep(interval)
+        changed_paths = watcher.poll()
+        if not changed_paths:
+            continue
+        
+        start = time.perf_counter()
+        try:
+            rebuilt = rebuild_changed(
+                changed_paths, content_dir, static_dir, template_path, dest_dir,
+                basepath, manifest,
+                jobs=jobs,
+                use_hash=use_hash,
+                document_cache=document_cache,
+                png_optimizer=png_optimizer,
+                fingerprint=fingerprint,
+                minify=minify,
+                site_url=site_url,
+                search_index=search_index,
+                check_links=check_links,
+                stream_threshold=stream_threshold,
+            )
+            if gzip_min_size is not None:
+                compress_outputs(dest_dir, manifest, gzip_min_size)
+        except Exception as e:
+            print(f"Rebuild failed: {type(e).__name__}: {e}")
+            continue
+        finally:
+            manifest.save()
+            if search_index is not None:
+                search_index.save()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {rebuilt} in {elapsed_ms:.1f} ms")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument(
+        "basepath", nargs="?", default="/",
+        help='Base path for URLs (e.g., "/" or "/repo-name/")',
+    )
+    parser.add_argument(
+        "--clean", action="store_true",
+        help="Delete the output directory and rebuild everything from scratch",
+    )
+    parser.add_argument(
+        "--plugin", action="append", default=[], metavar="MODULE",
+        help="Import MODULE to register custom block handlers (repeatable)",
+    )
+    parser.add_argument(
+        "--hash-static", action="store_true",
+        help="Compare static files by content hash instead of modification time",
+    )
+    parser.add_argument(
+        "--optimize-png", action="store_true",
+        help="Losslessly recompress PNG images instead of copying them",
+    )
+    parser.add_argument(
+        "--fingerprint", action="store_true",
+        help="Publish static files under content-hashed names and rewrite links to them",
+    )
+    parser.add_argument(
+        "--gzip", action="store_true",
+        help="Write precompressed .gz sidecars next to HTML, CSS and other text outputs",
+    )
+    parser.add_argument(
+        "--gzip-min-size", type=int, default=DEFAULT_MIN_SIZE, metavar="BYTES",
+        help=f"Skip .gz sidecars for files smaller than BYTES (default: {DEFAULT_MIN_SIZE})",
+    )
+    parser.add_argument(
+        "--minify", action="store_true",
+        help="Render minified HTML pages and report the bytes saved on each",
+    )
+    parser.add_argument(
+        "--site-url", metavar="URL",
+        help="Site origin (e.g. https://example.com) used to write sitemap.xml and "
+             "an Atom feed of blog/ pages",
+    )
+    parser.add_argument(
+        "--search", action="store_true",
+        help="Write a sharded client-side search index to docs/search/",
+    )
+    parser.add_argument(
+        "--check-links", action="store_true",
+        help="Check every internal link and image in the content against the built site "
+             "and exit with an error if any is broken",
+    )
+    parser.add_argument(
+        "--stream-threshold", type=float, metavar="MB",
+        help="Stream markdown files of at least MB megabytes block by block, "
+             "keeping memory bounded by the largest block",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of worker processes used to render pages (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--inline-cache", type=float, default=0, metavar="MB",
+        help="Memoize parsed inline fragments in an LRU cache of up to MB megabytes",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="After building, watch content/, static/ and template.html and rebuild on change",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=0.5,
+        help="Seconds between polls in --watch mode",
+    )
+    parser.add_argument(
+        "--trace", nargs="?", const="build-trace.json", metavar="PATH",
+        help="Record per-stage timing spans, write them as a Chrome trace-event "
+             "file (default: build-trace.json) and print a summary",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
-    # Get basepath from command line argument, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    args = parse_args(sys.argv[1:])
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    stream_threshold = (
+        int(args.stream_threshold * 1024 * 1024) if args.stream_threshold is not None else None
+    )
     
     print(f"Using basepath: {basepath}")
     print("Starting static site generator...\n")
     
-    # Copy static files to docs
-    copy_static_to_public(src_dir="static", dest_dir="docs")
+    if args.trace:
+        enable_tracing()
+    tracer = get_tracer()
     
-    print("\n" + "="*50)
-    print("Generating pages...\n")
+    if args.inline_cache > 0:
+        set_inline_cache(InlineCache(max_bytes=int(args.inline_cache * 1024 * 1024)))
+    load_plugins(args.plugin)
+    
+    manifest = BuildManifest(MANIFEST_PATH)
+    document_cache = DocumentCache(DOCUMENT_CACHE_DIR)
+    png_optimizer = PngOptimizer(PNG_CACHE_DIR) if args.optimize_png else None
+    if args.clean:
+        if os.path.exists("docs"):
+            print("Deleting docs directory...")
+            shutil.rmtree("docs")
+        if os.path.exists(DOCUMENT_CACHE_DIR):
+            shutil.rmtree(DOCUMENT_CACHE_DIR)
+        if os.path.exists(SEARCH_INDEX_PATH):
+            os.remove(SEARCH_INDEX_PATH)
+    else:
+        manifest = BuildManifest.load(MANIFEST_PATH)
     
-    # Generate all pages recursively
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+    # Without --search, drop the index published by a previous build
+    search_index = SearchIndex.load(SEARCH_INDEX_PATH) if args.search else None
+    if not args.search and os.path.exists(SEARCH_INDEX_PATH):
+        SearchIndex.load(SEARCH_INDEX_PATH).remove_published("docs")
+        os.remove(SEARCH_INDEX_PATH)
+    
+    try:
+        # Sync static files to docs, copying only new or changed ones
+        with tracer.span("sync_static"):
+            sync_static("static", "docs", manifest, args.hash_static, png_optimizer, args.fingerprint)
+        assets = load_asset_map("docs") if args.fingerprint else None
+        
+        print("\n" + "="*50)
+        print("Generating pages...\n")
+        
+        # Generate all pages recursively, skipping those whose inputs are unchanged
+        broken_links = generate_pages_recursive(
+            "content", "template.html", "docs", basepath,
+            manifest=manifest,
+            jobs=jobs,
+            document_cache=document_cache,
+            assets=assets,
+            minify=args.minify,
+            site_url=args.site_url,
+            search_index=search_index,
+            check_links=args.check_links,
+            static_dir="static",
+            stream_threshold=stream_threshold,
+        )
+        
+        # Precompress text outputs, or drop the sidecars of a previous --gzip build
+        with tracer.span("compress"):
+            if args.gzip:
+                compress_outputs("docs", manifest, args.gzip_min_size)
+            elif manifest.compressed:
+                remove_compressed("docs", manifest.compressed)
+                manifest.compressed = {}
+    finally:
+        manifest.save()
+        if search_index is not None:
+            search_index.save()
     
     print("\n" + "="*50)
     print("Static site generation complete!")
+    
+    cache = get_inline_cache()
+    if cache is not None:
+        print(f"Inline cache: {cache.hits} hits, {cache.misses} misses")
+    print(f"Document cache: {document_cache.hits} hits, {document_cache.misses} misses")
+    
+    if args.trace:
+        spans = tracer.drain()
+        write_chrome_trace(spans, args.trace)
+        print(f"\nTrace written to {args.trace}\n")
+        print(format_summary(spans))
+    
+    if broken_links and not args.watch:
+        sys.exit(f"\nFound {len(broken_links)} broken link(s)")
+    
+    if args.watch:
+        try:
+            watch(
+                "content", "static", "template.html", "docs", basepath, manifest,
+                jobs=jobs,
+                use_hash=args.hash_static,
+                interval=args.watch_interval,
+                document_cache=document_cache,
+                png_optimizer=png_optimizer,
+                fingerprint=args.fingerprint,
+                gzip_min_size=args.gzip_min_size if args.gzip else None,
+                minify=args.minify,
+                site_url=args.site_url,
+                search_index=search_index,
+                check_links=args.check_links,
+                stream_threshold=stream_threshold,
+            )
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
 
 
 if __name__ == "__main__":
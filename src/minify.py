@@ -0,0 +1,125 @@
+import re
+
+# Runs of ASCII whitespace; a non-breaking space is content, not whitespace
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r\f]+")
+
+# Attribute values that need no quotes (HTML unquoted attribute value syntax).
+# NUL is excluded too: it never appears in valid HTML, and the document cache
+# uses it to stand in for URLs, whose quotes are decided once they are filled in.
+UNQUOTED_VALUE_PATTERN = re.compile(r"[^ \t\n\r\f\"'=<>`\x00]+")
+
+# Void elements never have content, so their end tags are dropped; a </li>
+# may be omitted because the next <li> or the list's end tag closes it.
+OPTIONAL_END_TAGS = {"img", "br", "hr", "input", "meta", "link", "li"}
+
+# Elements around which whitespace in a template never renders
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "script", "style", "base",
+    "article", "aside", "div", "footer", "header", "main", "nav", "section",
+    "p", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6",
+    "pre", "blockquote", "table", "thead", "tbody", "tr", "td", "th", "hr", "!doctype",
+}
+
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+RAW_TEXT_PATTERN = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.DOTALL | re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<(/?)([!\w-]+)[^>]*>")
+QUOTED_ATTRIBUTE_PATTERN = re.compile(r'(\s[\w:-]+)="([^"]*)"')
+SELF_CLOSING_PATTERN = re.compile(r"\s*/>$")
+
+
+class Minifier:
+    """
+    Minifies HTML while an HTMLNode tree renders, counting the bytes it saves.
+
+    Nodes pass their text, attributes and end tags through it: whitespace
+    runs in text collapse to one space, attribute values are unquoted where
+    the syntax allows, and optional end tags are dropped. Nodes inside a
+    <pre> render without it, so preformatted text is untouched.
+    """
+
+    __slots__ = ("saved",)
+
+    def __init__(self):
+        self.saved = 0
+
+    def text(self, value):
+        collapsed = WHITESPACE_PATTERN.sub(" ", value)
+        self.saved += len(value) - len(collapsed)
+        return collapsed
+
+    def can_unquote(self, value):
+        return UNQUOTED_VALUE_PATTERN.fullmatch(value) is not None
+
+    def attribute(self, key, value):
+        if self.can_unquote(value):
+            self.saved += 2
+            return f"{key}={value}"
+        return f'{key}="{value}"'
+
+    def end_tag(self, tag):
+        if tag in OPTIONAL_END_TAGS:
+            self.saved += len(tag) + 3
+            return ""
+        return f"</{tag}>"
+
+
+def minify_html(html):
+    """
+    Minify an HTML document such as a page template, once, with regular
+    expressions: comments are removed, whitespace between block-level tags
+    is dropped and other whitespace runs collapse to one space, attribute
+    values are unquoted where possible and the "/" of self-closing tags is
+    removed. <pre>, <textarea>, <script> and <style> contents are kept as
+    they are.
+    """
+    html = COMMENT_PATTERN.sub("", html)
+
+    parts = []
+    position = 0
+    for match in RAW_TEXT_PATTERN.finditer(html):
+        parts.append(_minify_markup(html[position:match.start()]))
+        parts.append(_minify_raw_text(match.group(0)))
+        position = match.end()
+    parts.append(_minify_markup(html[position:]))
+    return "".join(parts)
+
+
+def _minify_markup(html):
+    pieces = []
+    position = 0
+    previous_tag = None
+    for match in TAG_PATTERN.finditer(html):
+        text = html[position:match.start()]
+        tag = match.group(2).lower()
+        if text.strip(" \t\n\r\f"):
+            pieces.append(WHITESPACE_PATTERN.sub(" ", text))
+        elif text and not (previous_tag in BLOCK_TAGS or tag in BLOCK_TAGS):
+            pieces.append(" ")
+        pieces.append(_minify_tag(match.group(0)))
+        previous_tag = tag
+        position = match.end()
+
+    text = html[position:]
+    if text.strip(" \t\n\r\f"):
+        pieces.append(WHITESPACE_PATTERN.sub(" ", text))
+    elif text and previous_tag not in BLOCK_TAGS:
+        pieces.append(" ")
+    return "".join(pieces)
+
+
+def _minify_raw_text(html):
+    """Minify only the start tag of a raw text element, keeping its content."""
+    start = TAG_PATTERN.match(html)
+    return _minify_tag(start.group(0)) + html[start.end():]
+
+
+def _minify_tag(tag):
+    tag = SELF_CLOSING_PATTERN.sub(">", tag)
+    return QUOTED_ATTRIBUTE_PATTERN.sub(_unquote_attribute, tag)
+
+
+def _unquote_attribute(match):
+    value = match.group(2)
+    if UNQUOTED_VALUE_PATTERN.fullmatch(value):
+        return f"{match.group(1)}={value}"
+    return match.group(0)
@@ -0,0 +1,164 @@
+import filecmp
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import get_tracer
+
+WRITER_THREADS = 4
+
+
+def write_if_changed(path, data):
+    """
+    Write data (str or bytes) to path unless the file already holds exactly
+    those bytes, so unchanged outputs keep their modification time.
+
+    The existing file is compared by size first and read only if the
+    sizes match. New content goes to a temporary file that is then moved
+    into place, so a failed write never leaves a truncated file behind.
+
+    Returns True if the file was written, False if it was already current.
+    """
+    content = data.encode() if isinstance(data, str) else data
+    try:
+        if os.path.getsize(path) == len(content):
+            with open(path, "rb") as f:
+                if f.read() == content:
+                    return False
+    except OSError:
+        pass
+
+    fd, tmp_path = _make_temp(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return True
+
+
+def _make_temp(path):
+    """
+    Create a temporary file next to path, creating its directory if needed.
+    Each call gets its own file, so concurrent writers of the same path
+    cannot remove or replace each other's temporary file.
+    Returns (fd, tmp_path).
+    """
+    # exist_ok: parallel writers may create the same directory concurrently
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    # mkstemp creates the file private to its owner
+    os.chmod(tmp_path, 0o644)
+    return fd, tmp_path
+
+
+class StreamedFile:
+    """
+    A text file written piece by piece to a temporary file, then moved
+    into place on close only if its content changed, so unchanged outputs
+    keep their modification time and a failed write leaves no partial file.
+    After closing, written tells whether the file was replaced.
+
+    Used as a context manager, it is closed on exit and discarded if the
+    block raised; close() can be called directly instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.written = False
+        fd, self.tmp_path = _make_temp(path)
+        # newline="": written exactly as given, like write_if_changed
+        self._file = os.fdopen(fd, "w", encoding="utf-8", newline="")
+
+    def write(self, text):
+        self._file.write(text)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(discard=exc_type is not None)
+        return False
+
+    def close(self, discard=False):
+        """
+        Move the file into place if its content changed, or drop it if
+        discard is set or the existing file already holds the same bytes.
+        """
+        self._file.close()
+        if not discard and not (
+            os.path.exists(self.path) and filecmp.cmp(self.tmp_path, self.path, shallow=False)
+        ):
+            os.replace(self.tmp_path, self.path)
+            self.written = True
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class OutputWriter:
+    """
+    Writes generated files with write_if_changed, counting how many were
+    written and how many were already current.
+
+    With threads > 0 writes are queued onto a thread pool, so disk I/O
+    overlaps with rendering the next page; call close() to wait for them
+    and collect their errors. With threads == 0 every write happens, and
+    raises, immediately.
+    """
+
+    def __init__(self, threads=WRITER_THREADS):
+        self.threads = threads
+        self.written = 0
+        self.unchanged = 0
+        self._executor = None
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def write(self, path, data, page=None):
+        if self.threads <= 0:
+            self._write(path, data, page)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        self._pending.append((path, self._executor.submit(self._write, path, data, page)))
+
+    def _write(self, path, data, page):
+        with get_tracer().span("write", page):
+            written = write_if_changed(path, data)
+        # Counting here, not in write(), keeps queued writes that fail out of the totals
+        self.count(written)
+
+    def count(self, written):
+        """Count a file written elsewhere (written is False if it was already current)."""
+        with self._lock:
+            if written:
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def close(self):
+        """
+        Wait for every queued write to finish.
+        Returns a dict mapping each path whose write failed to an error description.
+        """
+        errors = {}
+        for path, future in self._pending:
+            error = future.exception()
+            if error is not None:
+                errors[path] = f"{type(error).__name__}: {error}"
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return errors
+
+    def __repr__(self):
+        return f"OutputWriter({self.threads}, written={self.written}, unchanged={self.unchanged})"
@@ -0,0 +1,276 @@
+import hashlib
+import itertools
+import os
+import struct
+import zlib
+
+from output_writer import write_if_changed
+from tracing import get_tracer
+
+# Bump whenever a change to the optimizer alters its output, so images
+# optimized by an older version are optimized again.
+PNG_OPTIMIZER_VERSION = "1"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Ancillary chunks that change how an image is displayed. Everything else
+# that is not critical (text, timestamps, physical size, ...) is dropped.
+KEPT_ANCILLARY_CHUNKS = {b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"sBIT", b"cICP"}
+
+# Samples per pixel for each PNG color type
+COLOR_TYPE_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def read_chunks(data):
+    """
+    Split PNG data into a list of (chunk_type, body) pairs.
+    Raises ValueError if the data is not a well-formed PNG.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+
+    chunks = []
+    position = len(PNG_SIGNATURE)
+    while position < len(data):
+        if position + 12 > len(data):
+            raise ValueError("Truncated PNG chunk")
+        length, chunk_type = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        if len(body) != length or zlib.crc32(chunk_type + body) != crc:
+            raise ValueError(f"Corrupt PNG chunk {chunk_type!r}")
+        chunks.append((chunk_type, body))
+        position += 12 + length
+        if chunk_type == b"IEND":
+            break
+
+    if not chunks or chunks[0][0] != b"IHDR" or chunks[-1][0] != b"IEND":
+        raise ValueError("PNG must start with IHDR and end with IEND")
+    return chunks
+
+
+def write_chunks(chunks):
+    """Serialize (chunk_type, body) pairs into PNG data."""
+    parts = [PNG_SIGNATURE]
+    for chunk_type, body in chunks:
+        parts.append(struct.pack(">I4s", len(body), chunk_type))
+        parts.append(body)
+        parts.append(struct.pack(">I", zlib.crc32(chunk_type + body)))
+    return b"".join(parts)
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def unfilter_scanlines(data, row_bytes, height, bpp):
+    """Undo PNG filtering, returning the raw scanlines (without filter bytes)."""
+    rows = []
+    previous = bytearray(row_bytes)
+    position = 0
+    for _ in range(height):
+        filter_type = data[position]
+        row = bytearray(data[position + 1:position + 1 + row_bytes])
+        position += 1 + row_bytes
+        if len(row) != row_bytes:
+            raise ValueError("Truncated PNG image data")
+
+        if filter_type == 1:
+            for i in range(bpp, row_bytes):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif filter_type == 2:
+            row = bytearray((x + b) & 0xFF for x, b in zip(row, previous))
+        elif filter_type == 3:
+            for i in range(row_bytes):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif filter_type == 4:
+            for i in range(row_bytes):
+                if i >= bpp:
+                    row[i] = (row[i] + _paeth(row[i - bpp], previous[i], previous[i - bpp])) & 0xFF
+                else:
+                    row[i] = (row[i] + previous[i]) & 0xFF
+        elif filter_type != 0:
+            raise ValueError(f"Unknown PNG filter type {filter_type}")
+
+        rows.append(row)
+        previous = row
+    return rows
+
+
+def filter_row(filter_type, row, previous, bpp):
+    """Apply one PNG filter to a raw scanline, given the raw scanline above it."""
+    left = bytes(bpp) + row[:-bpp]
+    if filter_type == 0:
+        return bytes(row)
+    if filter_type == 1:
+        return bytes((x - a) & 0xFF for x, a in zip(row, left))
+    if filter_type == 2:
+        return bytes((x - b) & 0xFF for x, b in zip(row, previous))
+    if filter_type == 3:
+        return bytes((x - ((a + b) >> 1)) & 0xFF for x, a, b in zip(row, left, previous))
+    upper_left = bytes(bpp) + previous[:-bpp]
+    return bytes(
+        (x - _paeth(a, b, c)) & 0xFF for x, a, b, c in zip(row, left, previous, upper_left)
+    )
+
+
+def _filter_strategies(rows, bpp):
+    """
+    Yield filtered image data for each strategy worth trying: every fixed
+    filter, and the adaptive heuristic from the PNG specification that picks,
+    per row, the filter with the smallest sum of absolute signed bytes.
+    """
+    filtered = [[] for _ in range(5)]
+    adaptive = []
+    previous = bytes(len(rows[0])) if rows else b""
+    for row in rows:
+        candidates = [filter_row(filter_type, row, previous, bpp) for filter_type in range(5)]
+        best = min(
+            range(5),
+            key=lambda t: sum(b if b < 128 else 256 - b for b in candidates[t]),
+        )
+        for filter_type, candidate in enumerate(candidates):
+            filtered[filter_type].append(bytes((filter_type,)) + candidate)
+        adaptive.append(bytes((best,)) + candidates[best])
+        previous = row
+
+    for strategy in filtered:
+        yield b"".join(strategy)
+    yield b"".join(adaptive)
+
+
+def _drop_opaque_alpha(rows, width):
+    """
+    Return RGB rows for 8-bit RGBA rows whose alpha is fully opaque,
+    or None if any pixel is not.
+    """
+    pixels = b"".join(rows)
+    alpha = pixels[3::4]
+    if alpha.count(255) != len(alpha):
+        return None
+
+    rgb = bytearray(len(alpha) * 3)
+    rgb[0::3] = pixels[0::4]
+    rgb[1::3] = pixels[1::4]
+    rgb[2::3] = pixels[2::4]
+    row_bytes = width * 3
+    return [rgb[i:i + row_bytes] for i in range(0, len(rgb), row_bytes)]
+
+
+def optimize_png(data):
+    """
+    Losslessly re-encode PNG data, returning the smaller of the result
+    and the original.
+
+    Non-essential ancillary chunks are stripped, a fully opaque 8-bit alpha
+    channel is dropped, and the image data is re-deflated at the highest
+    zlib level both as it was filtered and re-filtered with each filter
+    strategy, keeping the smallest. Interlaced images
+    are only re-deflated. Animated PNGs and PNGs with unknown critical
+    chunks are returned unchanged.
+    """
+    chunks = read_chunks(data)
+    for chunk_type, _ in chunks:
+        if chunk_type == b"acTL" or (
+            chunk_type[0:1].isupper()
+            and chunk_type not in (b"IHDR", b"PLTE", b"IDAT", b"IEND")
+        ):
+            return data
+
+    ihdr = chunks[0][1]
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", ihdr)
+    if color_type not in COLOR_TYPE_CHANNELS:
+        raise ValueError(f"Unknown PNG color type {color_type}")
+    image_data = zlib.decompress(b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT"))
+
+    candidates = [image_data]
+    dropped_alpha = False
+    if not interlace:
+        channels = COLOR_TYPE_CHANNELS[color_type]
+        bpp = max(1, channels * bit_depth // 8)
+        row_bytes = (width * channels * bit_depth + 7) // 8
+        rows = unfilter_scanlines(image_data, row_bytes, height, bpp)
+        if color_type == 6 and bit_depth == 8:
+            rgb_rows = _drop_opaque_alpha(rows, width)
+            if rgb_rows is not None:
+                rows, color_type, bpp = rgb_rows, 2, 3
+                ihdr = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)
+                # The original data still has an alpha channel
+                candidates = []
+                dropped_alpha = True
+        candidates = itertools.chain(candidates, _filter_strategies(rows, bpp))
+
+    best = None
+    for candidate in candidates:
+        compressed = zlib.compress(candidate, 9)
+        if best is None or len(compressed) < len(best):
+            best = compressed
+
+    output = [(b"IHDR", ihdr)]
+    for chunk_type, body in chunks[1:-1]:
+        if chunk_type == b"IDAT":
+            if best is not None:
+                output.append((b"IDAT", best))
+                best = None
+        elif chunk_type == b"sBIT" and dropped_alpha:
+            # sBIT has one entry per channel, so it no longer fits
+            continue
+        elif chunk_type == b"PLTE" or chunk_type in KEPT_ANCILLARY_CHUNKS:
+            output.append((chunk_type, body))
+    output.append((b"IEND", b""))
+
+    optimized = write_chunks(output)
+    return optimized if len(optimized) < len(data) else data
+
+
+class PngOptimizer:
+    """
+    Optimizes PNG files into the output directory, caching each result
+    under cache_dir by the SHA-256 of the source so an image is only ever
+    optimized once. Tracks how many bytes the optimized files saved.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.optimized = 0
+        self.bytes_saved = 0
+
+    def _cache_path(self, source_hash):
+        return os.path.join(self.cache_dir, f"{source_hash}-v{PNG_OPTIMIZER_VERSION}.png")
+
+    def optimize_file(self, src_path, dest_path):
+        """
+        Write the optimized form of the PNG at src_path to dest_path.
+        A file that cannot be parsed as a PNG is copied unchanged.
+        """
+        with open(src_path, "rb") as f:
+            data = f.read()
+
+        cache_path = self._cache_path(hashlib.sha256(data).hexdigest())
+        try:
+            with open(cache_path, "rb") as f:
+                optimized = f.read()
+        except OSError:
+            with get_tracer().span("png_optimize", src_path):
+                try:
+                    optimized = optimize_png(data)
+                except (ValueError, zlib.error) as e:
+                    print(f"Not optimizing {src_path}: {e}")
+                    optimized = data
+            write_if_changed(cache_path, optimized)
+
+        write_if_changed(dest_path, optimized)
+        self.optimized += 1
+        self.bytes_saved += len(data) - len(optimized)
+
+    def __repr__(self):
+        return f"PngOptimizer({self.cache_dir}, saved={self.bytes_saved})"
@@ -0,0 +1,185 @@
+import json
+import os
+import re
+from collections import defaultdict
+
+from assets import remove_output
+from build_manifest import write_json_atomic
+from htmlnode import LeafNode
+from output_writer import write_if_changed
+
+# Bump whenever the index format or tokenizer changes, so the index is rebuilt
+SEARCH_INDEX_VERSION = "1"
+
+SEARCH_DIR = "search"
+DOCUMENTS_NAME = "documents.json"
+
+# Terms are sharded by their first PREFIX_LENGTH characters
+PREFIX_LENGTH = 2
+
+# Letters and digits, in any script; single characters are not indexed
+TOKEN_PATTERN = re.compile(r"[^\W_]{2,}")
+
+
+def tokenize(text):
+    """Split text into lowercase search terms."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def page_terms(title, html_node):
+    """
+    Return the sorted, distinct search terms of a page: its title and the
+    text of every leaf in its HTML node tree (tags and props are skipped).
+    """
+    terms = set(tokenize(title))
+    stack = [html_node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, LeafNode):
+            terms.update(tokenize(node.value))
+        elif node.children:
+            stack.extend(node.children)
+    return sorted(terms)
+
+
+def shard_name(prefix):
+    """
+    Return the file name of the shard holding terms that start with prefix.
+    ASCII letters and digits are used as they are; any other prefix is
+    spelled as its code points in hex, so names are portable.
+    """
+    if prefix.isascii() and prefix.isalnum():
+        return f"{prefix}.json"
+    return "x" + "-".join(f"{ord(c):x}" for c in prefix) + ".json"
+
+
+class SearchIndex:
+    """
+    A client-side search index, kept up to date across builds.
+
+    The state saved at path records, for each indexed page, its source
+    hash, document ID, URL, title and search terms, so an incremental
+    build only has to tokenize the pages it re-renders. Document IDs are
+    stable: a page keeps its ID while it exists, and IDs of removed pages
+    are reused.
+
+    write() publishes the index under dest_dir/search/: documents.json
+    holds the URL and title tables (indexed by document ID) and the map
+    from term prefix to shard file, and each shard maps its terms to
+    sorted lists of document IDs. A browser loads documents.json, then
+    only the shards for the prefixes of the words it searches for.
+    """
+
+    def __init__(self, path, pages=None, shards=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.shards = shards if shards is not None else []
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load index state from disk.
+        Missing, unreadable or outdated state yields an empty index.
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != SEARCH_INDEX_VERSION:
+            return cls(path)
+        return cls(path, pages=data.get("pages", {}), shards=data.get("shards", []))
+
+    def save(self):
+        write_json_atomic(self.path, {
+            "version": SEARCH_INDEX_VERSION,
+            "pages": self.pages,
+            "shards": self.shards,
+        })
+
+    def is_page_current(self, source_path, source_hash):
+        """Return True if the page at source_path is indexed from source_hash."""
+        entry = self.pages.get(source_path)
+        return entry is not None and entry.get("hash") == source_hash
+
+    def update_page(self, source_path, source_hash, url, title, terms):
+        """Index a page; a new page is given a document ID by the next write()."""
+        entry = self.pages.get(source_path)
+        doc_id = entry["id"] if entry is not None else None
+        self.pages[source_path] = {
+            "hash": source_hash, "id": doc_id, "url": url, "title": title, "terms": terms,
+        }
+
+    def forget_page(self, source_path):
+        self.pages.pop(source_path, None)
+
+    def prune_pages(self, live_sources):
+        """Forget pages whose source is no longer present."""
+        for source_path in list(self.pages):
+            if source_path not in live_sources:
+                del self.pages[source_path]
+
+    def _assign_ids(self):
+        used = set(entry["id"] for entry in self.pages.values())
+        doc_id = 0
+        for source_path in sorted(self.pages):
+            entry = self.pages[source_path]
+            if entry["id"] is None:
+                while doc_id in used:
+                    doc_id += 1
+                entry["id"] = doc_id
+                used.add(doc_id)
+
+    def write(self, dest_dir):
+        """
+        Write the index under dest_dir/search/, leaving files that already
+        hold the same bytes untouched and removing shards no longer needed.
+        Returns (written, unchanged) file counts.
+        """
+        self._assign_ids()
+        directory = os.path.join(dest_dir, SEARCH_DIR)
+        size = max((entry["id"] for entry in self.pages.values()), default=-1) + 1
+        urls = [None] * size
+        titles = [None] * size
+        shards = defaultdict(lambda: defaultdict(list))
+        for entry in sorted(self.pages.values(), key=lambda entry: entry["id"]):
+            urls[entry["id"]] = entry["url"]
+            titles[entry["id"]] = entry["title"]
+            for term in entry["terms"]:
+                shards[term[:PREFIX_LENGTH]][term].append(entry["id"])
+
+        names = {prefix: shard_name(prefix) for prefix in shards}
+        files = {DOCUMENTS_NAME: {
+            "version": SEARCH_INDEX_VERSION,
+            "prefix_length": PREFIX_LENGTH,
+            "shards": names,
+            "urls": urls,
+            "titles": titles,
+        }}
+        for prefix, postings in shards.items():
+            files[names[prefix]] = postings
+
+        written = unchanged = 0
+        for name, data in files.items():
+            text = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+            if write_if_changed(os.path.join(directory, name), text):
+                written += 1
+            else:
+                unchanged += 1
+
+        for name in self.shards:
+            if name not in files:
+                remove_output(os.path.join(directory, name), dest_dir)
+        self.shards = sorted(name for name in files if name != DOCUMENTS_NAME)
+        return written, unchanged
+
+    def remove_published(self, dest_dir):
+        """Delete the published index from dest_dir."""
+        directory = os.path.join(dest_dir, SEARCH_DIR)
+        for name in [DOCUMENTS_NAME] + self.shards:
+            remove_output(os.path.join(directory, name), dest_dir)
+        self.shards = []
+
+    def __repr__(self):
+        return f"SearchIndex({self.path}, pages={len(self.pages)}, shards={len(self.shards)})"
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from build_manifest import BuildManifest
+from main import generate_pages_recursive
+
+
+class SiteGenerationTestCase(unittest.TestCase):
+    """
+    Base for tests that build a small site with generate_pages_recursive.
+
+    setUp creates a temporary site root with content and dest directory
+    paths, a template.html holding TEMPLATE and an empty manifest;
+    subclasses call it and then write their pages. BUILD_OPTIONS holds the
+    generate_pages_recursive keyword arguments every build of the subclass
+    uses, and _build's own keyword arguments override them.
+    """
+
+    TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+    BUILD_OPTIONS = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.dest = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.manifest = BuildManifest(os.path.join(root, "manifest.json"))
+        self._write(self.template, self.TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def _generate(self, dest=None, **kwargs):
+        """
+        Build the site into dest (self.dest by default) with stdout captured.
+        Returns (what generate_pages_recursive returned, the build log).
+        """
+        options = {"manifest": self.manifest, **self.BUILD_OPTIONS, **kwargs}
+        out = StringIO()
+        with redirect_stdout(out):
+            result = generate_pages_recursive(
+                self.content, self.template, dest or self.dest, **options
+            )
+        return result, out.getvalue()
+
+    def _build(self, dest=None, **kwargs):
+        """Build the site like _generate and return the build log."""
+        return self._generate(dest, **kwargs)[1]
@@ -0,0 +1,123 @@
+import heapq
+import os
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from output_writer import StreamedFile
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+
+# The sitemap protocol's limit on URLs per file; larger sites get an index
+SITEMAP_MAX_URLS = 50000
+
+# Feeds carry only the most recent entries
+FEED_MAX_ENTRIES = 50
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+
+class SitePage:
+    """A published page as listed in the sitemap and feed."""
+
+    __slots__ = ("url", "modified", "title")
+
+    def __init__(self, url, modified, title=None):
+        self.url = url
+        self.modified = modified
+        self.title = title
+
+    def __repr__(self):
+        return f"SitePage({self.url}, {self.modified}, {self.title})"
+
+
+def page_url(site_url, basepath, dest_path, dest_dir):
+    """
+    Return the absolute URL a page in dest_dir is published at, with
+    index.html files served as their directory.
+    """
+    rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if rel_path == "index.html":
+        rel_path = ""
+    elif rel_path.endswith("/index.html"):
+        rel_path = rel_path[:-len("index.html")]
+    return f"{site_url.rstrip('/')}{basepath}{quote(rel_path)}"
+
+
+def write_sitemap(pages, count, dest_dir, base_url, max_urls=SITEMAP_MAX_URLS):
+    """
+    Stream the SitePages in pages (an iterable of count entries) into
+    dest_dir/sitemap.xml, one <url> at a time. Past max_urls URLs, they are
+    split across sitemap-1.xml, sitemap-2.xml, ... and sitemap.xml becomes
+    a sitemap index pointing at them.
+
+    Returns the names of the files written, relative to dest_dir.
+    """
+    if count <= max_urls:
+        with StreamedFile(os.path.join(dest_dir, SITEMAP_NAME)) as f:
+            _write_urlset(f, pages)
+        return [SITEMAP_NAME]
+
+    pages = iter(pages)
+    names = []
+    for start in range(0, count, max_urls):
+        name = f"sitemap-{len(names) + 1}.xml"
+        with StreamedFile(os.path.join(dest_dir, name)) as f:
+            _write_urlset(f, (next(pages) for _ in range(min(max_urls, count - start))))
+        names.append(name)
+
+    with StreamedFile(os.path.join(dest_dir, SITEMAP_NAME)) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n')
+        for name in names:
+            f.write(f"<sitemap><loc>{escape(base_url + name)}</loc></sitemap>\n")
+        f.write("</sitemapindex>\n")
+    return [SITEMAP_NAME] + names
+
+
+def _write_urlset(f, pages):
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write(f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n')
+    for page in pages:
+        lastmod = _timestamp(page.modified)[:10]
+        f.write(f"<url><loc>{escape(page.url)}</loc><lastmod>{lastmod}</lastmod></url>\n")
+    f.write("</urlset>\n")
+
+
+def write_feed(pages, dest_dir, base_url, title, max_entries=FEED_MAX_ENTRIES, author=None):
+    """
+    Write an Atom feed of the max_entries most recently modified SitePages
+    to dest_dir/feed.xml. Only those entries are ever held in memory,
+    however many pages there are.
+
+    Atom requires an author for every entry; a single feed-level author
+    covers them all, and defaults to the feed's title.
+
+    Returns the name of the file written, relative to dest_dir.
+    """
+    entries = heapq.nlargest(max_entries, pages, key=lambda page: (page.modified, page.url))
+    updated = _timestamp(entries[0].modified if entries else 0)
+
+    with StreamedFile(os.path.join(dest_dir, FEED_NAME)) as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write(f'<feed xmlns="{ATOM_NAMESPACE}">\n')
+        f.write(f"<title>{escape(title)}</title>\n")
+        f.write(f'<link href="{escape(base_url)}"/>\n')
+        f.write(f'<link rel="self" href="{escape(base_url + FEED_NAME)}"/>\n')
+        f.write(f"<id>{escape(base_url)}</id>\n")
+        f.write(f"<updated>{updated}</updated>\n")
+        f.write(f"<author><name>{escape(author or title)}</name></author>\n")
+        for page in entries:
+            f.write(
+                f"<entry><title>{escape(page.title or page.url)}</title>"
+                f'<link href="{escape(page.url)}"/><id>{escape(page.url)}</id>'
+                f"<updated>{_timestamp(page.modified)}</updated></entry>\n"
+            )
+        f.write("</feed>\n")
+    return FEED_NAME
+
+
+def _timestamp(mtime):
+    return datetime.fromtimestamp(int(mtime), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,169 @@
+import re
+
+from minify import Minifier, minify_html
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+ROOT_URL_PATTERN = re.compile(r'(href|src)="(/[^"]*)')
+ROOT_PATH_PATTERN = re.compile(r"/([^?#]*)")
+
+
+class UrlRewriter:
+    """
+    Maps a URL to where it is published: root-relative URLs move under
+    basepath, and paths in assets (relative to the site root, e.g.
+    "images/tom.png") become the fingerprinted names they were published
+    under. Other URLs are returned as they are.
+
+    A class rather than a closure so templates can be sent to worker processes.
+    Results are memoized: a site links the same few hundred URLs from
+    every page, and this is called for each of them as pages render.
+    """
+
+    def __init__(self, basepath, assets=None):
+        self.basepath = basepath
+        self.assets = assets or {}
+        self._cache = {}
+
+    def __call__(self, url):
+        try:
+            return self._cache[url]
+        except KeyError:
+            pass
+        rewritten = url
+        if url.startswith("/"):
+            match = ROOT_PATH_PATTERN.match(url)
+            path = match.group(1)
+            rewritten = f"{self.basepath}{self.assets.get(path, path)}{url[match.end():]}"
+        self._cache[url] = rewritten
+        return rewritten
+
+    def __repr__(self):
+        return f"UrlRewriter({self.basepath}, {self.assets})"
+
+
+def make_url_rewriter(basepath, assets=None):
+    """
+    Return a UrlRewriter for basepath and assets, or None when no URL
+    would change, so renderers can skip the hook.
+    """
+    if basepath == "/" and not assets:
+        return None
+    return UrlRewriter(basepath, assets)
+
+
+def rewrite_root_urls(html, basepath, assets=None):
+    """
+    Rewrite the root-relative href and src attributes in an HTML string
+    with make_url_rewriter(basepath, assets). Used for the template text;
+    page content is rewritten per node while it renders.
+    """
+    rewrite_url = make_url_rewriter(basepath, assets)
+    if rewrite_url is None:
+        return html
+    return ROOT_URL_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{rewrite_url(match.group(2))}', html
+    )
+
+
+class Template:
+    """
+    A page template compiled into static segments and named slots.
+
+    segments always has one more entry than slots; rendering interleaves
+    them, so a page costs a single join instead of a pass per placeholder.
+
+    A minify template renders its pages' content minified; saved is the
+    number of bytes minifying the template's own segments saved.
+    """
+
+    def __init__(self, segments, slots, basepath="/", assets=None, minify=False, saved=0):
+        if len(segments) != len(slots) + 1:
+            raise ValueError("Template must have exactly one more segment than slots")
+        self.segments = segments
+        self.slots = slots
+        self.basepath = basepath
+        self.assets = assets
+        self.minify = minify
+        self.saved = saved
+        self.rewrite_url = make_url_rewriter(basepath, assets)
+
+    def render(self, title, content_node):
+        """Fill the template's slots for one page and return its HTML."""
+        parts = []
+        self.write(parts.append, title, content_node)
+        return "".join(parts)
+
+    def write(self, write, title, content_node):
+        """
+        Stream a page to the write callable, rendering content_node directly
+        into the output instead of first building its HTML as one string.
+
+        URLs in the content's href and src props are rewritten to the
+        basepath and fingerprinted asset names as the nodes render, so text
+        such as code samples is never touched. The template's own URLs were
+        rewritten at compile time.
+
+        Returns the number of bytes minification saved on this page, or 0
+        when the template does not minify.
+        """
+        minifier = Minifier() if self.minify else None
+        write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            if slot == "Title":
+                write(title)
+            else:
+                content_node.write_html(write, self.rewrite_url, minifier)
+            write(segment)
+        return self.saved + minifier.saved if minifier is not None else 0
+
+    def __repr__(self):
+        return (
+            f"Template({self.segments}, {self.slots}, {self.basepath}, {self.assets}, "
+            f"minify={self.minify})"
+        )
+
+
+def compile_template(template_content, basepath="/", assets=None, minify=False):
+    """
+    Compile template text into a Template.
+    Root-relative URLs in the template itself are rewritten to basepath
+    (and fingerprinted asset names) here, once, rather than on every
+    rendered page. With minify, the template text is minified here too.
+    """
+    template_content = rewrite_root_urls(template_content, basepath, assets)
+    saved = 0
+    if minify:
+        minified = minify_html(template_content)
+        saved = len(template_content.encode()) - len(minified.encode())
+        template_content = minified
+
+    segments = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template_content):
+        segments.append(template_content[position:match.start()])
+        slots.append(match.group(1))
+        position = match.end()
+    segments.append(template_content[position:])
+
+    if minify:
+        # Content always renders as a <div>, so whitespace around it is insignificant
+        for i, slot in enumerate(slots):
+            if slot == "Content":
+                saved += _strip_whitespace(segments, i, str.rstrip)
+                saved += _strip_whitespace(segments, i + 1, str.lstrip)
+
+    return Template(segments, slots, basepath, assets, minify, saved)
+
+
+def _strip_whitespace(segments, index, strip):
+    stripped = strip(segments[index], " \t\n\r\f")
+    removed = len(segments[index]) - len(stripped)
+    segments[index] = stripped
+    return removed
+
+
+def load_template(template_path, basepath="/", assets=None, minify=False):
+    """Read and compile the template at template_path."""
+    with open(template_path, 'r') as f:
+        return compile_template(f.read(), basepath, assets, minify)
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from assets import fingerprinted_name, load_asset_map, sync_static
+from build_manifest import BuildManifest
+
+
+class SyncStaticTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self._write(os.path.join(self.src, "index.css"), "body {}")
+        self._write(os.path.join(self.src, "images", "a.png"), "png-a")
+        self._write(os.path.join(self.src, "images", "b.png"), "png-b")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _sync(self, use_hash=False, fingerprint=False):
+        with redirect_stdout(StringIO()):
+            return sync_static(self.src, self.dest, self.manifest, use_hash, fingerprint=fingerprint)
+
+
+
+class TestSyncStatic(SyncStaticTestCase):
+    def test_first_sync_copies_everything(self):
+        copied = self._sync()
+        self.assertEqual(len(copied), 3)
+        with open(os.path.join(self.dest, "images", "b.png")) as f:
+            self.assertEqual(f.read(), "png-b")
+        self.assertEqual(
+            self.manifest.static_files,
+            ["images/a.png", "images/b.png", "index.css"],
+        )
+
+    def test_unchanged_files_are_not_copied(self):
+        self._sync()
+        self.assertEqual(self._sync(), [])
+
+    def test_changed_file_is_copied(self):
+        self._sync()
+        self._write(os.path.join(self.src, "index.css"), "body { color: red }")
+        self.assertEqual(self._sync(), [os.path.join(self.dest, "index.css")])
+
+    def test_touched_file_skipped_with_hash(self):
+        self._sync()
+        css = os.path.join(self.src, "index.css")
+        os.utime(css, ns=(0, 10**18))
+        self.assertEqual(self._sync(use_hash=True), [])
+        self.assertEqual(self._sync(), [])
+
+    def test_removed_source_removes_output_only(self):
+        self._sync()
+        page = os.path.join(self.dest, "images", "page.html")
+        self._write(page, "<p>generated</p>")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        os.remove(os.path.join(self.src, "images", "b.png"))
+        self._sync()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+        self.assertTrue(os.path.exists(page))
+        self.assertEqual(self.manifest.static_files, ["index.css"])
+
+
+class TestFingerprinting(SyncStaticTestCase):
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("index.css", "0123456789ab"), "index.01234567.css")
+        self.assertEqual(
+            fingerprinted_name(os.path.join("a.b", "LICENSE"), "0123456789ab"),
+            os.path.join("a.b", "LICENSE.01234567"),
+        )
+
+    def test_assets_are_published_under_hashed_names(self):
+        self._sync(fingerprint=True)
+        assets = load_asset_map(self.dest)
+        self.assertEqual(sorted(assets), ["images/a.png", "images/b.png", "index.css"])
+        with open(os.path.join(self.dest, assets["index.css"])) as f:
+            self.assertEqual(f.read(), "body {}")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_unchanged_assets_keep_their_names(self):
+        self._sync(fingerprint=True)
+        before = load_asset_map(self.dest)
+        self._write(os.path.join(self.src, "index.css"), "body { color: red }")
+        self.assertEqual(len(self._sync(fingerprint=True)), 1)
+        after = load_asset_map(self.dest)
+        self.assertEqual(before["images/a.png"], after["images/a.png"])
+        self.assertNotEqual(before["index.css"], after["index.css"])
+        # The previous version of the changed file is removed
+        self.assertFalse(os.path.exists(os.path.join(self.dest, before["index.css"])))
+
+    def test_disabling_restores_plain_names(self):
+        self._sync(fingerprint=True)
+        self._sync()
+        self.assertEqual(load_asset_map(self.dest), {})
+        self.assertEqual(
+            sorted(os.listdir(self.dest)), ["images", "index.css"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
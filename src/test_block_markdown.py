@@ -1,12 +1,31 @@
+import random
 import unittest
 
 from block_markdown import (
     markdown_to_blocks,
     block_to_block_type,
+    parse_markdown,
+    BlockScanner,
+    BlockHandler,
+    StreamedDocument,
+    block_to_html_node,
+    custom_block_handlers,
+    lines_to_block_type,
+    register_block_handler,
+    unregister_block_handler,
+    find_title,
+    read_lines,
+    Block,
     BlockType,
     markdown_to_html_node,
     extract_title,
+    set_inline_cache,
+    text_to_children,
 )
+from io import StringIO
+
+from htmlnode import LeafNode, ParentNode
+from inline_markdown import InlineCache
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -190,6 +209,140 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
+def note_to_html_node(lines):
+    return ParentNode("aside", text_to_children(" ".join(lines[1:])), {"class": "note"})
+
+
+def html_to_html_node(lines):
+    return LeafNode(None, "\n".join(lines))
+
+
+class TestBlockHandlers(unittest.TestCase):
+    def tearDown(self):
+        unregister_block_handler("note")
+        unregister_block_handler("html")
+
+    def test_builtin_handlers_are_not_custom(self):
+        self.assertEqual(custom_block_handlers(), [])
+
+    def test_custom_block_type(self):
+        register_block_handler(
+            BlockHandler("note", "!", lambda lines: lines[0] == "!!! note", note_to_html_node)
+        )
+        self.assertEqual(lines_to_block_type(["!!! note", "Be **careful**."]), "note")
+        self.assertEqual(lines_to_block_type(["!!! other"]), BlockType.PARAGRAPH)
+        self.assertEqual(
+            markdown_to_html_node("# Title\n\n!!! note\nBe **careful**.").to_html(),
+            '<div><h1>Title</h1><aside class="note">Be <b>careful</b>.</aside></div>',
+        )
+        self.assertEqual(custom_block_handlers(), [f"note:{__name__}.note_to_html_node"])
+
+    def test_custom_type_is_tried_before_builtin_types(self):
+        # An HTML passthrough that claims "<" blocks, and a "-" lead shared
+        # with unordered lists
+        register_block_handler(BlockHandler(
+            "html", "<-", lambda lines: lines[0].startswith(("<", "-->")), html_to_html_node,
+        ))
+        self.assertEqual(
+            markdown_to_html_node("<video src=\"a.mp4\">\n</video>\n\n- item").to_html(),
+            '<div><video src="a.mp4">\n</video><ul><li>item</li></ul></div>',
+        )
+        self.assertEqual(lines_to_block_type(["-->"]), "html")
+
+    def test_unregistered_type_becomes_paragraphs(self):
+        register_block_handler(
+            BlockHandler("note", "!", lambda lines: True, note_to_html_node)
+        )
+        block = Block("note", ["!!! note", "text"])
+        self.assertEqual(repr(block), "Block(note, ['!!! note', 'text'])")
+        unregister_block_handler("note")
+        self.assertEqual(lines_to_block_type(block.lines), BlockType.PARAGRAPH)
+        with self.assertRaises(ValueError):
+            block_to_html_node(block)
+
+    def test_reregistering_replaces_the_handler(self):
+        register_block_handler(BlockHandler("note", "!", lambda lines: True, note_to_html_node))
+        register_block_handler(BlockHandler("note", "?", lambda lines: True, note_to_html_node))
+        self.assertEqual(lines_to_block_type(["!!! note"]), BlockType.PARAGRAPH)
+        self.assertEqual(lines_to_block_type(["??? note"]), "note")
+
+
+class TestParseMarkdown(unittest.TestCase):
+    def test_blocks_and_title(self):
+        md = (
+            "# Title\n"
+            "\n"
+            "Some *text*\n"
+            "on two lines\n"
+            "\n"
+            "- a\n"
+            "* b\n"
+            "\n"
+            "1. one\n"
+            "2. two\n"
+        )
+        blocks, title = parse_markdown(md)
+        self.assertEqual(title, "Title")
+        self.assertEqual(
+            blocks,
+            [
+                Block(BlockType.HEADING, ["# Title"]),
+                Block(BlockType.PARAGRAPH, ["Some *text*", "on two lines"]),
+                Block(BlockType.UNORDERED_LIST, ["- a", "* b"]),
+                Block(BlockType.ORDERED_LIST, ["1. one", "2. two"]),
+            ],
+        )
+
+    def test_no_title(self):
+        blocks, title = parse_markdown("## Sub\n\ntext")
+        self.assertIsNone(title)
+        self.assertEqual(len(blocks), 2)
+
+    def test_title_found_inside_other_block(self):
+        _, title = parse_markdown("intro\n  # Late title  \n\n# Second")
+        self.assertEqual(title, "Late title")
+
+    def test_whitespace_is_stripped_around_blocks(self):
+        blocks, _ = parse_markdown("\n  \n   first  \n  last  \n \n\n\t\n")
+        self.assertEqual(blocks, [Block(BlockType.PARAGRAPH, ["first  ", "  last"])])
+
+    def test_matches_markdown_to_blocks(self):
+        fragments = [
+            "# h", "## h", "####### h", "#nospace", "> q", ">q", "- u", "* u",
+            "1. o", "2. o", "3. o", "```", "```\ncode\n```", "text", "  ",
+            "\t", "", "**b**", "* ", "1.x",
+        ]
+        rng = random.Random(7)
+        for _ in range(2000):
+            lines = [rng.choice(fragments) for _ in range(rng.randint(0, 10))]
+            md = "\n".join(lines)
+            expected = [
+                Block(block_to_block_type(block), block.split("\n"))
+                for block in markdown_to_blocks(md)
+            ]
+            blocks, _ = parse_markdown(md)
+            self.assertEqual(blocks, expected, repr(md))
+
+
+class TestInlineCacheIntegration(unittest.TestCase):
+    def tearDown(self):
+        set_inline_cache(None)
+
+    def test_cached_children_are_shared(self):
+        cache = InlineCache()
+        set_inline_cache(cache)
+        first = text_to_children("By **the author**")
+        self.assertIs(text_to_children("By **the author**"), first)
+        self.assertEqual(cache.hits, 1)
+
+    def test_output_unchanged_with_cache(self):
+        md = "# T\n\n- same _item_\n- same _item_\n\nsame _item_\n\n> same _item_"
+        expected = markdown_to_html_node(md).to_html()
+        set_inline_cache(InlineCache())
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+
+
 class TestMarkdownToHTMLNode(unittest.TestCase):
     def test_paragraphs(self):
         md = (
@@ -309,6 +462,47 @@ class TestExtractTitle(unittest.TestCase):
             extract_title(md)
 
 
+class TestStreamedDocument(unittest.TestCase):
+    MARKDOWN = (
+        "# Title\n\nA **bold** [link](/a).\n\n```\ncode\nmore\n```\n\n"
+        "> quote\n\n- one\n- two\n\n1. first\n2. second\n"
+    )
+
+    def _render(self, document):
+        parts = []
+        document.write_html(parts.append)
+        return "".join(parts)
+
+    def test_matches_markdown_to_html_node(self):
+        lines = read_lines(StringIO(self.MARKDOWN))
+        document = StreamedDocument(BlockScanner().scan(lines))
+        self.assertEqual(self._render(document), markdown_to_html_node(self.MARKDOWN).to_html())
+
+    def test_blocks_are_parsed_as_they_are_written(self):
+        parts = []
+        nodes = []
+        document = StreamedDocument(
+            BlockScanner().scan(read_lines(StringIO("# One\n\nTwo"))),
+            lambda node: nodes.append((node.tag, len(parts))),
+        )
+        document.write_html(parts.append)
+        # Each block's node is reported right after its HTML is written
+        self.assertEqual([tag for tag, _ in nodes], ["h1", "p"])
+        self.assertLess(nodes[0][1], nodes[1][1])
+
+    def test_read_lines_strips_line_endings(self):
+        self.assertEqual(list(read_lines(StringIO("a\n\nb\n"))), ["a", "", "b"])
+        self.assertEqual(list(read_lines(StringIO("a\nb"))), ["a", "b"])
+
+    def test_find_title_stops_at_the_title(self):
+        lines = iter(["intro", "# Title", "rest"])
+        self.assertEqual(find_title(lines), "Title")
+        self.assertEqual(list(lines), ["rest"])
+
+    def test_find_title_without_h1(self):
+        self.assertIsNone(find_title(["## Sub", "text"]))
+
+
 if __name__ == "__main__":
     unittest.main()
 
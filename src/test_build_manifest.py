@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest, GENERATOR_VERSION
+from site_test_case import SiteGenerationTestCase
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_missing_is_empty(self):
+        manifest = BuildManifest.load(self.path)
+        self.assertEqual(manifest.pages, {})
+        self.assertIsNone(manifest.template_hash)
+
+    def test_load_corrupt_is_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(BuildManifest.load(self.path).pages, {})
+
+    def test_save_and_load_roundtrip(self):
+        manifest = BuildManifest(self.path)
+        manifest.set_global_inputs("t1", "/")
+        manifest.record_page("content/a.md", "h1", "docs/a.html")
+        manifest.save()
+
+        loaded = BuildManifest.load(self.path)
+        self.assertEqual(loaded.generator_version, GENERATOR_VERSION)
+        self.assertEqual(loaded.template_hash, "t1")
+        self.assertEqual(loaded.basepath, "/")
+        self.assertEqual(
+            loaded.pages, {"content/a.md": {"hash": "h1", "output": "docs/a.html"}}
+        )
+
+    def _assert_invalidated(self, manifest):
+        # The entry is kept, with its output, but no source hash matches it
+        self.assertEqual(manifest.pages, {"content/a.md": {"hash": None, "output": "docs/a.html"}})
+
+    def test_global_input_change_invalidates_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.set_global_inputs("t1", "/")
+        manifest.record_page("content/a.md", "h1", "docs/a.html")
+        manifest.set_global_inputs("t1", "/repo/")
+        self._assert_invalidated(manifest)
+
+    def test_older_generator_version_invalidates_pages(self):
+        manifest = BuildManifest(self.path, generator_version="1", template_hash="t1", basepath="/")
+        manifest.record_page("content/a.md", "h1", "docs/a.html")
+        manifest.set_global_inputs("t1", "/")
+        self._assert_invalidated(manifest)
+        self.assertEqual(manifest.generator_version, GENERATOR_VERSION)
+
+    def test_asset_change_invalidates_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.set_global_inputs("t1", "/", {"index.css": "index.1.css"})
+        manifest.record_page("content/a.md", "h1", "docs/a.html")
+        manifest.set_global_inputs("t1", "/", {"index.css": "index.1.css"})
+        self.assertEqual(len(manifest.pages), 1)
+        manifest.set_global_inputs("t1", "/", {"index.css": "index.2.css"})
+        self._assert_invalidated(manifest)
+
+    def test_minify_change_invalidates_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.set_global_inputs("t1", "/")
+        manifest.record_page("content/a.md", "h1", "docs/a.html")
+        manifest.set_global_inputs("t1", "/", minify=True)
+        self._assert_invalidated(manifest)
+        manifest.save()
+        self.assertTrue(BuildManifest.load(self.path).minify)
+
+    def test_block_handler_change_invalidates_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.set_global_inputs("t1", "/")
+        manifest.record_page("content/a.md", "h1", "docs/a.html")
+        manifest.set_global_inputs("t1", "/", block_handlers=["note:plugin.note"])
+        self._assert_invalidated(manifest)
+        manifest.save()
+        self.assertEqual(BuildManifest.load(self.path).block_handlers, ["note:plugin.note"])
+
+    def test_is_page_current_requires_output(self):
+        dest = os.path.join(self.tmp.name, "a.html")
+        manifest = BuildManifest(self.path)
+        manifest.record_page("content/a.md", "h1", dest)
+        self.assertFalse(manifest.is_page_current("content/a.md", "h1", dest))
+        open(dest, "w").close()
+        self.assertTrue(manifest.is_page_current("content/a.md", "h1", dest))
+        self.assertFalse(manifest.is_page_current("content/a.md", "h2", dest))
+
+    def test_prune_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.record_page("a.md", "h1", "a.html")
+        manifest.record_page("b.md", "h2", "b.html")
+        self.assertEqual(manifest.prune_pages({"a.md"}), ["b.html"])
+        self.assertEqual(list(manifest.pages), ["a.md"])
+
+
+class TestIncrementalGeneration(SiteGenerationTestCase):
+    def setUp(self):
+        super().setUp()
+        self._write(os.path.join(self.content, "index.md"), "# Home")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Post")
+
+    def test_second_build_skips_everything(self):
+        self._build()
+        log = self._build()
+        self.assertNotIn("Generating page", log)
+        self.assertIn("Skipped 2 unchanged page(s)", log)
+
+    def test_only_changed_page_is_regenerated(self):
+        self._build()
+        self._write(os.path.join(self.content, "index.md"), "# New Home")
+        log = self._build()
+        self.assertEqual(log.count("Generating page"), 1)
+        with open(os.path.join(self.dest, "index.html")) as f:
+            self.assertEqual(f.read(), "<title>New Home</title><div><h1>New Home</h1></div>")
+
+    def test_template_change_regenerates_all(self):
+        self._build()
+        self._write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        log = self._build()
+        self.assertEqual(log.count("Generating page"), 2)
+
+    def test_removed_source_deletes_output(self):
+        self._build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self._build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertNotIn(
+            os.path.join(self.content, "blog", "post.md"), self.manifest.pages
+        )
+
+    def test_removed_source_deletes_output_on_global_change(self):
+        self._build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self._write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        log = self._build()
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertEqual(list(self.manifest.pages), [os.path.join(self.content, "index.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
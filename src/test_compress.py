@@ -0,0 +1,75 @@
+import gzip
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from build_manifest import BuildManifest
+from compress import compress_outputs, gzip_bytes, remove_compressed
+
+
+class TestCompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.page = os.path.join(self.dest, "blog", "index.html")
+        self._write(self.page, "<p>page</p>" * 200)
+        self._write(os.path.join(self.dest, "index.css"), "body {}\n" * 200)
+        self._write(os.path.join(self.dest, "tiny.html"), "<p>hi</p>")
+        self._write(os.path.join(self.dest, "image.png"), "x" * 5000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _compress(self, min_size=1024):
+        out = StringIO()
+        with redirect_stdout(out):
+            compress_outputs(self.dest, self.manifest, min_size, threads=2)
+        return out.getvalue()
+
+    def test_text_outputs_above_threshold_get_sidecars(self):
+        self._compress()
+        with gzip.open(f"{self.page}.gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>page</p>" * 200)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tiny.html.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "image.png.gz")))
+        self.assertEqual(
+            sorted(self.manifest.compressed),
+            [os.path.join("blog", "index.html"), "index.css"],
+        )
+
+    def test_unchanged_outputs_are_skipped(self):
+        self._compress()
+        self.assertIn("0 written, 2 unchanged", self._compress())
+        self._write(self.page, "<p>edited</p>" * 200)
+        self.assertIn("1 written, 1 unchanged", self._compress())
+
+    def test_sidecars_are_deterministic(self):
+        self.assertEqual(gzip_bytes(b"abc" * 100), gzip_bytes(b"abc" * 100))
+
+    def test_stale_sidecars_are_removed(self):
+        self._compress()
+        os.remove(self.page)
+        self._compress()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self._compress(min_size=10**6)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+        self.assertEqual(self.manifest.compressed, {})
+
+    def test_remove_compressed(self):
+        self._compress()
+        with redirect_stdout(StringIO()):
+            self.assertEqual(remove_compressed(self.dest, self.manifest.compressed), 2)
+        self.assertFalse(os.path.exists(f"{self.page}.gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
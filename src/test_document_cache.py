@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+
+from block_markdown import BlockHandler, register_block_handler, unregister_block_handler
+from document_cache import CachedDocument, DocumentCache, PARSER_VERSION
+from htmlnode import LeafNode, ParentNode
+from minify import Minifier
+from site_test_case import SiteGenerationTestCase
+
+
+class TestDocumentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = DocumentCache(os.path.join(self.tmp.name, "documents"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("h1"))
+        self.cache.put("h1", "Title", LeafNode("div", ""))
+        self.assertEqual(self.cache.get("h1"), ("Title", CachedDocument(["<div></div>"], [])))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("h1", "Title", LeafNode("div", ""))
+        with open(os.path.join(self.cache.directory, "h1.json"), "w") as f:
+            f.write('{"parser_version": ')
+        self.assertIsNone(self.cache.get("h1"))
+        self.cache.put("h1", "Title", LeafNode("div", ""))
+        self.assertEqual(self.cache.get("h1")[1].to_html(), "<div></div>")
+
+    def test_other_parser_version_is_a_miss(self):
+        self.cache.put("h1", "Title", LeafNode("div", ""))
+        with open(os.path.join(self.cache.directory, "h1.json"), "w") as f:
+            f.write('{"parser_version": "old-%s", "hash": "h1", "title": "T", "parts": [""], "urls": []}'
+                    % PARSER_VERSION)
+        self.assertIsNone(self.cache.get("h1"))
+
+    def test_other_block_handlers_are_a_miss(self):
+        self.cache.put("h1", "Title", LeafNode("div", ""))
+        register_block_handler(BlockHandler("note", "!", bool, lambda lines: LeafNode("aside", "")))
+        try:
+            self.assertIsNone(self.cache.get("h1"))
+            self.cache.put("h1", "Title", LeafNode("div", ""))
+            self.assertIsNotNone(self.cache.get("h1"))
+        finally:
+            unregister_block_handler("note")
+        self.assertIsNone(self.cache.get("h1"))
+
+    def test_prune_removes_dead_entries_and_temporary_files(self):
+        self.cache.put("h1", "A", LeafNode("p", "a"))
+        self.cache.put("h2", "B", LeafNode("p", "b"))
+        open(os.path.join(self.cache.directory, "h1.json.abc.tmp"), "w").close()
+        self.assertEqual(self.cache.prune({"h1"}), 2)
+        self.assertEqual(os.listdir(self.cache.directory), ["h1.json"])
+
+    def test_cached_document_keeps_urls_unresolved(self):
+        node = ParentNode("p", [
+            LeafNode("a", "home", {"href": "/"}),
+            LeafNode("code", 'href="/x"'),
+            LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+        ])
+        document = self.cache.put("h1", "T", node)
+        self.assertEqual(document.urls, ["/", "/a.png"])
+        _, cached = self.cache.get("h1")
+        prefix = lambda url: "/repo" + url
+        self.assertEqual(cached.to_html(prefix), node.to_html(prefix))
+        self.assertEqual(cached.to_html(), node.to_html())
+
+    def test_minified_document_is_cached_separately(self):
+        node = ParentNode("ul", [
+            ParentNode("li", [LeafNode("a", "a  b", {"href": "/x y"})]),
+            ParentNode("li", [LeafNode("a", "c", {"href": "/z"})]),
+        ])
+        self.cache.put("h1", "T", node)
+        document = self.cache.put("h1", "T", node, minify=True)
+        self.assertEqual(document.parts, ['<ul><li><a href="', '">a b</a><li><a href="', '">c</a></ul>'])
+        self.assertEqual(document.saved, 1 + 2 * len("</li>"))
+        self.assertEqual(sorted(os.listdir(self.cache.directory)), ["h1.json", "h1.min.json"])
+        self.assertEqual(self.cache.get("h1", minify=True), ("T", document))
+
+        # URL quotes are dropped while rendering, where the URL allows it
+        minifier = Minifier()
+        self.assertEqual(
+            document.to_html(None, minifier),
+            '<ul><li><a href="/x y">a b</a><li><a href=/z>c</a></ul>',
+        )
+        self.assertEqual(minifier.saved, document.saved + 2)
+        self.assertEqual(self.cache.prune({"h1"}), 0)
+
+    def test_search_terms_are_cached(self):
+        self.cache.put("h1", "T", LeafNode("p", "a"))
+        self.assertIsNone(self.cache.get("h1", terms=True))
+        self.cache.put("h1", "T", LeafNode("p", "a"), terms=["alpha"])
+        _, document = self.cache.get("h1", terms=True)
+        self.assertEqual(document.terms, ["alpha"])
+
+    def test_content_containing_the_marker_is_not_cached(self):
+        self.assertIsNone(self.cache.put("h1", "T", LeafNode("p", "a\x00b")))
+        self.assertIsNone(self.cache.get("h1"))
+
+
+class TestDocumentCacheGeneration(SiteGenerationTestCase):
+    def setUp(self):
+        super().setUp()
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\n[a](/blog/post.html)")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.cache = DocumentCache(os.path.join(self.tmp.name, "documents"))
+        self.BUILD_OPTIONS = {"document_cache": self.cache}
+
+    def test_template_change_reuses_parsed_documents(self):
+        self._build()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+        self._write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        self._build()
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        self.assertEqual(
+            self._read(os.path.join(self.dest, "blog", "post.html")),
+            "<h2>Post</h2><div><h1>Post</h1></div>",
+        )
+
+    def test_basepath_change_rewrites_cached_content(self):
+        self._build()
+        self._build(basepath="/repo/", jobs=2)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertIn(
+            '<a href="/repo/blog/post.html">a</a>',
+            self._read(os.path.join(self.dest, "index.html")),
+        )
+
+    def test_cached_output_matches_fresh_parse(self):
+        self._build()
+        fresh = self._read(os.path.join(self.dest, "index.html"))
+        os.remove(os.path.join(self.dest, "index.html"))
+        self._build()
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self._read(os.path.join(self.dest, "index.html")), fresh)
+
+    def test_edited_page_entry_is_pruned(self):
+        self._build()
+        self._write(os.path.join(self.content, "index.md"), "# New Home")
+        self._build()
+        self.assertEqual(len(os.listdir(self.cache.directory)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
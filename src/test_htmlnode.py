@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, LeafNode, ParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -42,6 +42,12 @@ class TestHTMLNode(unittest.TestCase):
             "HTMLNode(a, Click me, None, {'href': 'https://www.boot.dev'})"
         )
     
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            LeafNode("b", "x").extra = 1
+    
     def test_node_with_children(self):
         child1 = HTMLNode("span", "Hello")
         child2 = HTMLNode("span", "World")
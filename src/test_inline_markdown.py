@@ -1,3 +1,4 @@
+import random
 import unittest
 from textnode import TextNode, TextType
 
@@ -7,7 +8,9 @@ from inline_markdown import (
     extract_markdown_links,
     split_nodes_image,
     split_nodes_link,
-    text_to_textnodes
+    text_to_textnodes,
+    multipass_text_to_textnodes,
+    InlineCache,
 )
 
 
@@ -141,6 +144,94 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertListEqual(expected, nodes)    
 
 
+class TestTextToTextNodesDifferential(unittest.TestCase):
+    FRAGMENTS = [
+        "a", "bc", " ", "*", "**", "***", "_", "`", "[", "]", "(", ")", "!",
+        "![img](/i.png)", "[link](/l)", "[a*b](u_v)", "![x`y](z)", "**bold**",
+        "_it_", "`code`", "![", "](", "[](", "\n",
+    ]
+
+    def assert_same_as_multipass(self, text):
+        try:
+            expected = multipass_text_to_textnodes(text)
+        except ValueError as e:
+            with self.assertRaises(ValueError) as ctx:
+                text_to_textnodes(text)
+            self.assertEqual(str(ctx.exception), str(e), repr(text))
+            return
+        self.assertListEqual(expected, text_to_textnodes(text), repr(text))
+
+    def test_matches_multipass_on_random_input(self):
+        rng = random.Random(1234)
+        for _ in range(5000):
+            length = rng.randint(0, 12)
+            text = "".join(rng.choice(self.FRAGMENTS) for _ in range(length))
+            self.assert_same_as_multipass(text)
+
+    def test_matches_multipass_on_edge_cases(self):
+        cases = [
+            "",
+            "***",
+            "****",
+            "a***b***c",
+            "**a*b*c**",
+            "`**`",
+            "*a_b*",
+            "_a*b*c_",
+            "[a](![b)](c)",
+            "![a](b)[c](d)",
+            "!![a](b)",
+            "**a** and _b_ and `c` and *d*",
+            "**unclosed and _also unclosed",
+            "[x](y) **z",
+        ]
+        for text in cases:
+            self.assert_same_as_multipass(text)
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_hit_returns_shared_tuple(self):
+        cache = InlineCache()
+        first = cache.lookup("a **b**", text_to_textnodes)
+        second = cache.lookup("a **b**", text_to_textnodes)
+        self.assertIsInstance(first, tuple)
+        self.assertIs(first, second)
+        self.assertEqual(list(first), text_to_textnodes("a **b**"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = InlineCache(max_entries=2)
+        cache.lookup("a", text_to_textnodes)
+        cache.lookup("b", text_to_textnodes)
+        cache.lookup("a", text_to_textnodes)
+        cache.lookup("c", text_to_textnodes)
+        self.assertEqual(len(cache), 2)
+        cache.lookup("a", text_to_textnodes)
+        self.assertEqual(cache.hits, 2)
+        cache.lookup("b", text_to_textnodes)
+        self.assertEqual(cache.misses, 4)
+
+    def test_memory_cap(self):
+        cache = InlineCache(max_bytes=2000)
+        for i in range(100):
+            cache.lookup(f"fragment number {i} with _some_ text", text_to_textnodes)
+        self.assertLessEqual(cache.size_bytes, 2000)
+        self.assertLess(len(cache), 100)
+
+    def test_oversized_fragment_is_not_cached(self):
+        cache = InlineCache(max_bytes=100)
+        nodes = cache.lookup("x" * 1000, text_to_textnodes)
+        self.assertEqual(nodes, (TextNode("x" * 1000, TextType.TEXT),))
+        self.assertEqual(len(cache), 0)
+
+    def test_parse_errors_are_not_cached(self):
+        cache = InlineCache()
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.lookup("**open", text_to_textnodes)
+        self.assertEqual(len(cache), 0)
+
+
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_split_code_single(self):
         node = TextNode("This is text with a `code block` word", TextType.TEXT)
@@ -412,6 +503,13 @@ class TestSplitNodesImage(unittest.TestCase):
         ]
         self.assertListEqual(expected, new_nodes)
 
+    def test_split_images_many_matches(self):
+        node = TextNode("x ![a](/a.png) " * 5000, TextType.TEXT)
+        new_nodes = split_nodes_image([node])
+        self.assertEqual(len(new_nodes), 10001)
+        self.assertEqual(new_nodes[-2], TextNode("a", TextType.IMAGE, "/a.png"))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.TEXT))
+
 
 class TestSplitNodesLink(unittest.TestCase):
     def test_split_links(self):
@@ -500,6 +598,23 @@ class TestSplitNodesLink(unittest.TestCase):
         ]
         self.assertListEqual(expected, new_nodes)
 
+    def test_split_links_after_identical_image(self):
+        # The link is split where it matched, not at the first place its
+        # markdown appears (inside the image)
+        node = TextNode("![a](b) and [a](b)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        expected = [
+            TextNode("![a](b) and ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "b"),
+        ]
+        self.assertListEqual(expected, new_nodes)
+
+    def test_split_links_many_matches(self):
+        text = "see [a](/b) " * 5000
+        new_nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
+        self.assertEqual(len(new_nodes), 10001)
+        self.assertEqual(new_nodes, text_to_textnodes(text))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,72 @@
+import os
+import unittest
+
+from document_cache import CachedDocument
+from htmlnode import LeafNode, ParentNode
+from link_check import build_path_index, find_broken_links, is_published, page_links, resolve_link
+from site_test_case import SiteGenerationTestCase
+
+
+class TestLinkCheck(unittest.TestCase):
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link("/images/a.png", "blog/tom/index.html"), "images/a.png")
+        self.assertEqual(resolve_link("../majesty/", "blog/tom/index.html"), "blog/majesty/")
+        self.assertEqual(resolve_link("a%20b.png?v=1#top", "blog/index.html"), "blog/a b.png")
+        self.assertEqual(resolve_link("/", "blog/index.html"), "")
+        self.assertEqual(resolve_link("../../../x", "blog/index.html"), "../../x")
+
+    def test_external_and_fragment_links_are_not_checked(self):
+        for url in ("https://x.y/a", "//cdn.x.y/a.js", "mailto:a@x.y", "#section"):
+            self.assertIsNone(resolve_link(url, "index.html"))
+
+    def test_is_published(self):
+        index = {"index.html", "blog/tom/index.html", "contact.html", "index.css"}
+        for path in ("", "blog/tom/", "blog/tom", "contact", "contact.html", "index.css"):
+            self.assertTrue(is_published(path, index), path)
+        for path in ("blog/", "blog/tom.html", "about", "../index.css"):
+            self.assertFalse(is_published(path, index), path)
+
+    def test_page_links(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode("a", "x", {"href": "/a"}), LeafNode("code", "/b")]),
+            LeafNode("img", "", {"src": "/c.png", "alt": "c"}),
+        ])
+        self.assertEqual(page_links(node), ["/a", "/c.png"])
+        self.assertEqual(page_links(CachedDocument.from_node(node)), ["/a", "/c.png"])
+
+    def test_find_broken_links(self):
+        index = build_path_index([os.path.join("docs", "index.html")], "docs")
+        self.assertEqual(
+            find_broken_links("index.html", ["/", "/missing", "https://x.y/", "#top"], index),
+            ["/missing"],
+        )
+
+
+class TestLinkCheckGeneration(SiteGenerationTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.BUILD_OPTIONS = {"basepath": "/repo/", "check_links": True, "static_dir": self.static}
+        self._write(os.path.join(self.static, "images", "a.png"), "png")
+        self._write(
+            os.path.join(self.content, "index.md"),
+            "# Home\n\n[Tom](/blog/tom) ![a](/images/a.png) [gone](/blog/gone/)",
+        )
+        self._write(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom\n\n[home](../../)")
+
+    def _broken_links(self, jobs=1):
+        return self._generate(jobs=jobs)[0]
+
+    def test_broken_links_found_without_reparsing(self):
+        home = os.path.join(self.content, "index.md")
+        self.assertEqual(self._broken_links(jobs=2), [(home, "/blog/gone/")])
+
+        # Skipped pages are checked from the links recorded in the manifest
+        self._write(os.path.join(self.content, "blog", "gone", "index.md"), "# Gone")
+        self.assertEqual(self._broken_links(), [])
+        os.remove(os.path.join(self.content, "blog", "tom", "index.md"))
+        self.assertEqual(self._broken_links(), [(home, "/blog/tom")])
+
+
+if __name__ == "__main__":
+    unittest.main()
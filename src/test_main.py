@@ -0,0 +1,123 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import discover_pages, generate_page, generate_pages_recursive
+from site_test_case import SiteGenerationTestCase
+
+
+class TestGeneratePages(SiteGenerationTestCase):
+    TEMPLATE = "<title>{{ Title }}</title>\n<a href=\"/\">home</a>{{ Content }}"
+    BUILD_OPTIONS = {"basepath": "/base/", "manifest": None}
+
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            self._write(
+                os.path.join(self.content, f"section{i % 2}", f"page{i}.md"),
+                f"# Page {i}\n\nSome **bold** text with a [link](/section{i % 2}/).\n\n- a\n- b",
+            )
+
+    def _read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_discover_pages(self):
+        pages = discover_pages(self.content, "out")
+        self.assertEqual(len(pages), 6)
+        self.assertIn(
+            (os.path.join(self.content, "section1", "page3.md"),
+             os.path.join("out", "section1", "page3.html")),
+            pages,
+        )
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        self._build(serial, jobs=1)
+        self._build(parallel, jobs=3)
+        self.assertEqual(self._read_tree(serial), self._read_tree(parallel))
+
+    def test_errors_are_reported_per_page(self):
+        bad = os.path.join(self.content, "section0", "bad.md")
+        self._write(bad, "no title here")
+        dest = os.path.join(self.tmp.name, "out")
+        out = StringIO()
+        with redirect_stdout(out):
+            with self.assertRaises(ValueError) as ctx:
+                generate_pages_recursive(self.content, self.template, dest, "/", jobs=2)
+        self.assertIn(bad, str(ctx.exception))
+        self.assertIn(f"Error generating page {bad}: ValueError: No h1 header", out.getvalue())
+        # The remaining pages are still generated
+        self.assertEqual(len(self._read_tree(dest)), 6)
+
+    def test_unchanged_pages_are_not_rewritten(self):
+        dest = os.path.join(self.tmp.name, "out")
+        self._build(dest, jobs=1)
+        page = os.path.join(dest, "section0", "page0.html")
+        os.utime(page, ns=(1, 1))
+        log = self._build(dest, jobs=2)
+        self.assertIn("Wrote 0 page(s), 6 identical page(s) left untouched", log)
+        self.assertEqual(os.stat(page).st_mtime_ns, 1)
+
+    def test_direct_write_skips_identical_page(self):
+        src = os.path.join(self.content, "section0", "page0.md")
+        dest = os.path.join(self.tmp.name, "out", "page0.html")
+        with redirect_stdout(StringIO()):
+            generate_page(src, self.template, dest, "/base/")
+            os.utime(dest, ns=(1, 1))
+            generate_page(src, self.template, dest, "/base/")
+        self.assertEqual(os.stat(dest).st_mtime_ns, 1)
+        self.assertEqual(os.listdir(os.path.dirname(dest)), ["page0.html"])
+        with open(dest) as f:
+            self.assertIn('<a href="/base/section0/">link</a>', f.read())
+
+    def test_write_errors_are_reported_per_page(self):
+        dest = os.path.join(self.tmp.name, "out")
+        os.makedirs(os.path.join(dest, "section1", "page1.html"))
+        out = StringIO()
+        with redirect_stdout(out):
+            with self.assertRaises(ValueError) as ctx:
+                generate_pages_recursive(self.content, self.template, dest, "/", jobs=1)
+        self.assertIn(os.path.join(self.content, "section1", "page1.md"), str(ctx.exception))
+        self.assertIn("Wrote 5 page(s)", out.getvalue())
+
+    def test_streamed_pages_match_parsed_pages(self):
+        self._write(
+            os.path.join(self.content, "crlf.md"),
+            "# CRLF\r\n\r\nA [link](/x) and ![img](/i.png).\r\n\r\n```\r\ncode\r\n```",
+        )
+        for minify in (False, True):
+            parsed = os.path.join(self.tmp.name, f"parsed{minify}")
+            streamed = os.path.join(self.tmp.name, f"streamed{minify}")
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive(
+                    self.content, self.template, parsed, "/base/", jobs=1, minify=minify,
+                )
+                generate_pages_recursive(
+                    self.content, self.template, streamed, "/base/", jobs=2, minify=minify,
+                    stream_threshold=0,
+                )
+            self.assertEqual(self._read_tree(parsed), self._read_tree(streamed))
+
+    def test_streamed_pages_are_not_rewritten_when_unchanged(self):
+        dest = os.path.join(self.tmp.name, "out")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, dest, "/", jobs=1)
+        page = os.path.join(dest, "section0", "page0.html")
+        os.utime(page, ns=(1, 1))
+        out = StringIO()
+        with redirect_stdout(out):
+            generate_pages_recursive(self.content, self.template, dest, "/", jobs=1, stream_threshold=0)
+        self.assertIn("Wrote 0 page(s), 6 identical page(s) left untouched", out.getvalue())
+        self.assertEqual(os.stat(page).st_mtime_ns, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from minify import Minifier, minify_html
+
+
+class TestMinifier(unittest.TestCase):
+    def test_text_collapses_whitespace(self):
+        minifier = Minifier()
+        self.assertEqual(minifier.text("a \n\t b\n"), "a b ")
+        self.assertEqual(minifier.saved, 3)
+
+    def test_text_keeps_non_breaking_spaces(self):
+        minifier = Minifier()
+        self.assertEqual(minifier.text("a  b"), "a  b")
+        self.assertEqual(minifier.saved, 0)
+
+    def test_attribute_unquoted_when_possible(self):
+        minifier = Minifier()
+        self.assertEqual(minifier.attribute("href", "/a/b.html?x#y"), "href=/a/b.html?x#y")
+        self.assertEqual(minifier.attribute("alt", "two words"), 'alt="two words"')
+        self.assertEqual(minifier.attribute("alt", ""), 'alt=""')
+        self.assertEqual(minifier.attribute("title", "a=b"), 'title="a=b"')
+        self.assertEqual(minifier.saved, 2)
+
+    def test_optional_end_tags(self):
+        minifier = Minifier()
+        self.assertEqual(minifier.end_tag("img"), "")
+        self.assertEqual(minifier.end_tag("li"), "")
+        self.assertEqual(minifier.end_tag("p"), "</p>")
+        self.assertEqual(minifier.saved, len("</img></li>"))
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_whitespace_between_blocks_is_removed(self):
+        self.assertEqual(
+            minify_html("<div>\n  <p>a  b</p>\n  <p>c</p>\n</div>\n"),
+            "<div><p>a b</p><p>c</p></div>",
+        )
+
+    def test_whitespace_between_inline_elements_is_kept(self):
+        self.assertEqual(minify_html("<span>a</span>\n\n<span>b</span>"), "<span>a</span> <span>b</span>")
+
+    def test_comments_removed_except_conditional(self):
+        self.assertEqual(
+            minify_html("<p>a<!-- note\n --></p><!--[if IE]><p>ie</p><![endif]-->"),
+            "<p>a</p><!--[if IE]><p>ie</p><![endif]-->",
+        )
+
+    def test_raw_text_elements_untouched(self):
+        html = '<pre class="x">  a\n   b</pre><script>if (a  <  b) {}</script>'
+        self.assertEqual(minify_html(html), '<pre class=x>  a\n   b</pre><script>if (a  <  b) {}</script>')
+
+    def test_self_closing_and_attributes(self):
+        self.assertEqual(
+            minify_html('<meta name="viewport" content="width=device-width, initial-scale=1" />'),
+            '<meta name=viewport content="width=device-width, initial-scale=1">',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+
+from output_writer import OutputWriter, StreamedFile, write_if_changed
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out", "page.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self):
+        with open(self.path) as f:
+            return f.read()
+
+    def test_creates_missing_file(self):
+        self.assertTrue(write_if_changed(self.path, "<p>ä</p>"))
+        self.assertEqual(self._read(), "<p>ä</p>")
+
+    def test_identical_content_is_not_rewritten(self):
+        write_if_changed(self.path, "<p>a</p>")
+        os.utime(self.path, ns=(1, 1))
+        self.assertFalse(write_if_changed(self.path, "<p>a</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+
+    def test_same_size_different_content_is_rewritten(self):
+        write_if_changed(self.path, "<p>a</p>")
+        self.assertTrue(write_if_changed(self.path, "<p>b</p>"))
+        self.assertEqual(self._read(), "<p>b</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+
+class TestStreamedFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, name):
+        with open(os.path.join(self.dest, name)) as f:
+            return f.read()
+
+    def test_unchanged_file_is_not_replaced(self):
+        path = os.path.join(self.dest, "a.xml")
+        with StreamedFile(path) as f:
+            f.write("same\r\n")
+        self.assertTrue(f.written)
+        os.utime(path, (1704164645, 1704164645))
+        with StreamedFile(path) as f:
+            f.write("same\r\n")
+        self.assertFalse(f.written)
+        self.assertEqual(os.path.getmtime(path), 1704164645)
+        self.assertEqual(os.listdir(self.dest), ["a.xml"])
+
+    def test_failed_write_keeps_previous_file(self):
+        path = os.path.join(self.dest, "a.xml")
+        with StreamedFile(path) as f:
+            f.write("old")
+        with self.assertRaises(RuntimeError):
+            with StreamedFile(path) as f:
+                f.write("new")
+                raise RuntimeError("boom")
+        self.assertEqual(self._read("a.xml"), "old")
+        self.assertEqual(os.listdir(self.dest), ["a.xml"])
+
+    def test_close_without_context_manager(self):
+        path = os.path.join(self.dest, "a.xml")
+        f = StreamedFile(path)
+        f.write("kept")
+        f.close()
+        self.assertTrue(f.written)
+        f = StreamedFile(path)
+        f.write("dropped")
+        f.close(discard=True)
+        self.assertFalse(f.written)
+        self.assertEqual(self._read("a.xml"), "kept")
+        self.assertEqual(os.listdir(self.dest), ["a.xml"])
+
+    def test_open_writers_of_one_path_use_their_own_temporary_files(self):
+        path = os.path.join(self.dest, "a.xml")
+        first = StreamedFile(path)
+        second = StreamedFile(path)
+        self.assertNotEqual(first.tmp_path, second.tmp_path)
+        with first:
+            first.write("first")
+        with second:
+            second.write("second")
+        self.assertEqual(self._read("a.xml"), "second")
+        self.assertEqual(os.listdir(self.dest), ["a.xml"])
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_threaded_writes_are_counted(self):
+        writer = OutputWriter(threads=2)
+        for i in range(10):
+            writer.write(os.path.join(self.tmp.name, f"{i % 5}.html"), f"page {i % 5}")
+        self.assertEqual(writer.close(), {})
+        self.assertEqual(writer.written + writer.unchanged, 10)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 5)
+
+    def test_concurrent_writes_of_one_path_do_not_clash(self):
+        path = os.path.join(self.tmp.name, "page.html")
+        writer = OutputWriter(threads=8)
+        for i in range(200):
+            writer.write(path, f"version {i % 2}")
+        self.assertEqual(writer.close(), {})
+        self.assertEqual(os.listdir(self.tmp.name), ["page.html"])
+
+    def test_threaded_errors_are_collected_by_path(self):
+        os.mkdir(os.path.join(self.tmp.name, "dir.html"))
+        writer = OutputWriter(threads=2)
+        writer.write(os.path.join(self.tmp.name, "dir.html"), "x")
+        writer.write(os.path.join(self.tmp.name, "ok.html"), "x")
+        errors = writer.close()
+        self.assertEqual(list(errors), [os.path.join(self.tmp.name, "dir.html")])
+        self.assertEqual(writer.written, 1)
+
+    def test_unthreaded_writes_raise_immediately(self):
+        os.mkdir(os.path.join(self.tmp.name, "dir.html"))
+        writer = OutputWriter(threads=0)
+        with self.assertRaises(OSError):
+            writer.write(os.path.join(self.tmp.name, "dir.html"), "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
+from io import StringIO
 
-from htmlnode import ParentNode, LeafNode
+from htmlnode import HTMLNode, ParentNode, LeafNode
+from minify import Minifier
+from template import compile_template
 
 
 class TestParentNode(unittest.TestCase):
@@ -92,6 +95,84 @@ class TestParentNode(unittest.TestCase):
         expected = "<div><section><article><p><b>Deep</b> nesting</p></article></section></div>"
         self.assertEqual(node.to_html(), expected)
     
+    def test_write_html_to_list(self):
+        node = ParentNode("ul", [
+            ParentNode("li", [LeafNode("b", "one")]),
+            ParentNode("li", [LeafNode(None, "two")]),
+        ], {"class": "items"})
+        parts = []
+        node.write_html(parts.append)
+        self.assertEqual(
+            parts,
+            ['<ul class="items">', "<li>", "<b>one</b>", "</li>", "<li>", "two", "</li>", "</ul>"],
+        )
+        self.assertEqual("".join(parts), node.to_html())
+    
+    def test_write_html_to_stream(self):
+        node = ParentNode("p", [LeafNode("i", "a"), LeafNode(None, "b")])
+        stream = StringIO()
+        node.write_html(stream.write)
+        self.assertEqual(stream.getvalue(), "<p><i>a</i>b</p>")
+    
+    def test_write_html_long_list(self):
+        items = [ParentNode("li", [LeafNode(None, str(i))]) for i in range(5000)]
+        html = ParentNode("ol", items).to_html()
+        self.assertTrue(html.startswith("<ol><li>0</li><li>1</li>"))
+        self.assertTrue(html.endswith("<li>4999</li></ol>"))
+    
+    def test_write_html_custom_child_uses_to_html(self):
+        class Raw(HTMLNode):
+            def to_html(self):
+                return "<hr>"
+        node = ParentNode("div", [Raw(), LeafNode(None, "x")])
+        self.assertEqual(node.to_html(), "<div><hr>x</div>")
+    
+    def test_write_html_custom_child_without_hooks(self):
+        # A to_html(self) override is called without the hooks, and rendered as is
+        class Raw(HTMLNode):
+            def to_html(self):
+                return '<a href="/raw">  raw  </a>'
+        node = ParentNode("div", [Raw(), LeafNode("a", " x  y ", {"href": "/x"})])
+        template = compile_template("{{ Content }}", "/base/")
+        self.assertEqual(
+            template.render("T", node),
+            '<div><a href="/raw">  raw  </a><a href="/base/x"> x  y </a></div>',
+        )
+        self.assertEqual(
+            node.to_html(lambda url: "/base" + url, Minifier()),
+            '<div><a href="/raw">  raw  </a><a href=/base/x> x y </a></div>',
+        )
+    
+    def test_write_html_leaf_subclass_uses_to_html(self):
+        # LeafNode's own write_html must not bypass a subclass's to_html
+        class Shout(LeafNode):
+            def to_html(self):
+                return self.value.upper()
+        node = ParentNode("p", [Shout(None, "hi")])
+        self.assertEqual(node.to_html(lambda url: url), "<p>HI</p>")
+    
+    def test_write_html_custom_child_overriding_write_html(self):
+        class Rule(HTMLNode):
+            def write_html(self, write, rewrite_url=None, minifier=None):
+                write("<hr>" if minifier is not None else "<hr />")
+        node = ParentNode("div", [Rule()])
+        self.assertEqual(node.to_html(None, Minifier()), "<div><hr></div>")
+        self.assertEqual(node.to_html(lambda url: url), "<div><hr /></div>")
+    
+    def test_to_html_minified(self):
+        minifier = Minifier()
+        node = ParentNode("div", [
+            ParentNode("ul", [ParentNode("li", [LeafNode(None, "one\n  two")])], {"class": "items"}),
+            ParentNode("pre", [LeafNode("code", "x\n  y")]),
+            LeafNode("img", "", {"src": "/a.png", "alt": "an image"}),
+        ])
+        self.assertEqual(
+            node.to_html(None, minifier),
+            '<div><ul class=items><li>one two</ul><pre><code>x\n  y</code></pre>'
+            '<img src=/a.png alt="an image"></div>',
+        )
+        self.assertEqual(minifier.saved, len(node.to_html()) - len(node.to_html(None, Minifier())))
+
     def test_repr(self):
         node = ParentNode("div", [LeafNode("p", "text")])
         repr_str = repr(node)
@@ -0,0 +1,163 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+import zlib
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from assets import sync_static
+from build_manifest import BuildManifest
+from png_optimize import (
+    PngOptimizer,
+    filter_row,
+    optimize_png,
+    read_chunks,
+    unfilter_scanlines,
+    write_chunks,
+)
+
+
+def make_png(width, height, color_type=6, alpha=255, extra_chunks=(), seed=0):
+    """Build an 8-bit PNG with smooth gradients and some noise, unfiltered."""
+    rng = random.Random(seed)
+    channels = {2: 3, 6: 4}[color_type]
+    rows = []
+    for y in range(height):
+        row = bytearray()
+        for x in range(width):
+            pixel = [(x * 4 + y) & 0xFF, (y * 3) & 0xFF, rng.randrange(4)]
+            if color_type == 6:
+                pixel.append(alpha)
+            row.extend(pixel)
+        rows.append(b"\x00" + bytes(row))
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    chunks = [(b"IHDR", ihdr), *extra_chunks]
+    chunks.append((b"IDAT", zlib.compress(b"".join(rows), 1)))
+    chunks.append((b"IEND", b""))
+    return write_chunks(chunks)
+
+
+def decode_pixels(data):
+    """Return (width, height, color_type, rgba pixel bytes) for an 8-bit RGB(A) PNG."""
+    chunks = read_chunks(data)
+    width, height, _, color_type, _, _, _ = struct.unpack(">IIBBBBB", chunks[0][1])
+    channels = {2: 3, 6: 4}[color_type]
+    image_data = zlib.decompress(b"".join(body for t, body in chunks if t == b"IDAT"))
+    pixels = b"".join(unfilter_scanlines(image_data, width * channels, height, channels))
+    if channels == 3:
+        rgba = bytearray(len(pixels) // 3 * 4)
+        rgba[0::4] = pixels[0::3]
+        rgba[1::4] = pixels[1::3]
+        rgba[2::4] = pixels[2::3]
+        rgba[3::4] = b"\xff" * (len(pixels) // 3)
+        pixels = bytes(rgba)
+    return width, height, color_type, pixels
+
+
+class TestOptimizePng(unittest.TestCase):
+    def test_filters_roundtrip(self):
+        rng = random.Random(1)
+        rows = [bytes(rng.randrange(256) for _ in range(12)) for _ in range(4)]
+        for filter_type in range(5):
+            data = b""
+            previous = bytes(12)
+            for row in rows:
+                data += bytes((filter_type,)) + filter_row(filter_type, row, previous, 3)
+                previous = row
+            self.assertEqual(unfilter_scanlines(data, 12, 4, 3), rows)
+
+    def test_optimized_png_has_identical_pixels(self):
+        original = make_png(40, 30, alpha=128)
+        optimized = optimize_png(original)
+        self.assertLess(len(optimized), len(original))
+        self.assertEqual(decode_pixels(optimized), decode_pixels(original))
+
+    def test_opaque_alpha_is_dropped(self):
+        original = make_png(40, 30, alpha=255)
+        optimized = optimize_png(original)
+        width, height, color_type, pixels = decode_pixels(optimized)
+        self.assertEqual(color_type, 2)
+        self.assertEqual(pixels, decode_pixels(original)[3])
+
+    def test_non_essential_chunks_are_stripped(self):
+        original = make_png(8, 8, extra_chunks=[
+            (b"sRGB", b"\x00"), (b"tEXt", b"Comment\x00hello"), (b"tIME", bytes(7)),
+        ])
+        chunk_types = [t for t, _ in read_chunks(optimize_png(original))]
+        self.assertEqual(chunk_types, [b"IHDR", b"sRGB", b"IDAT", b"IEND"])
+
+    def test_never_returns_larger_output(self):
+        original = make_png(1, 1, color_type=2)
+        tight = optimize_png(original)
+        self.assertEqual(optimize_png(tight), tight)
+
+    def test_invalid_png_is_rejected(self):
+        with self.assertRaises(ValueError):
+            optimize_png(b"not a png")
+        corrupt = bytearray(make_png(4, 4))
+        corrupt[20] ^= 0xFF
+        with self.assertRaises(ValueError):
+            optimize_png(bytes(corrupt))
+
+
+class TestPngOptimizerSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.cache = os.path.join(self.tmp.name, "png")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        os.makedirs(os.path.join(self.src, "images"))
+        self.png = make_png(40, 30)
+        with open(os.path.join(self.src, "images", "a.png"), "wb") as f:
+            f.write(self.png)
+        with open(os.path.join(self.src, "images", "broken.png"), "wb") as f:
+            f.write(b"not a png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sync(self, optimize=True):
+        optimizer = PngOptimizer(self.cache) if optimize else None
+        out = StringIO()
+        with redirect_stdout(out):
+            copied = sync_static(self.src, self.dest, self.manifest, png_optimizer=optimizer)
+        return copied, optimizer, out.getvalue()
+
+    def _read(self, name):
+        with open(os.path.join(self.dest, "images", name), "rb") as f:
+            return f.read()
+
+    def test_sync_optimizes_and_reports_savings(self):
+        _, optimizer, log = self._sync()
+        optimized = self._read("a.png")
+        self.assertEqual(optimizer.bytes_saved, len(self.png) - len(optimized))
+        self.assertIn(f"PNG optimization: saved {optimizer.bytes_saved} bytes", log)
+        self.assertEqual(self._read("broken.png"), b"not a png")
+
+    def test_optimized_outputs_are_up_to_date(self):
+        self._sync()
+        copied, _, _ = self._sync()
+        self.assertEqual(copied, [])
+
+    def test_results_are_cached_by_content(self):
+        self._sync()
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+        os.remove(os.path.join(self.dest, "images", "a.png"))
+        with patch("png_optimize.optimize_png", side_effect=AssertionError("not cached")):
+            _, optimizer, _ = self._sync()
+        self.assertEqual(optimizer.optimized, 1)
+        self.assertLess(len(self._read("a.png")), len(self.png))
+
+    def test_toggling_optimization_rewrites_pngs(self):
+        self._sync()
+        copied, _, _ = self._sync(optimize=False)
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(self._read("a.png"), self.png)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from htmlnode import LeafNode, ParentNode
+from search_index import SearchIndex, page_terms, shard_name, tokenize
+from site_test_case import SiteGenerationTestCase
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Tolkien's *Middle-earth*, 1954 a_b é"), ["tolkien", "middle", "earth", "1954"])
+        self.assertEqual(tokenize("Ainulindalë"), ["ainulindalë"])
+
+    def test_page_terms_use_title_and_text_only(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hello "), LeafNode("a", "world", {"href": "/secret"})]),
+            LeafNode("img", "", {"src": "/x.png", "alt": "hidden"}),
+        ])
+        self.assertEqual(page_terms("Greeting hello", node), ["greeting", "hello", "world"])
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("ab"), "ab.json")
+        self.assertEqual(shard_name("é"), "xe9.json")
+        self.assertEqual(shard_name("日本"), "x65e5-672c.json")
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.index = SearchIndex(os.path.join(self.tmp.name, "search.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, name):
+        with open(os.path.join(self.dest, "search", name)) as f:
+            return json.load(f)
+
+    def test_write_tables_and_shards(self):
+        self.index.update_page("b.md", "h2", "/b.html", "B", ["apple", "banana"])
+        self.index.update_page("a.md", "h1", "/a.html", "A", ["apple"])
+        self.assertEqual(self.index.write(self.dest), (3, 0))
+
+        documents = self._read("documents.json")
+        self.assertEqual(documents["urls"], ["/a.html", "/b.html"])
+        self.assertEqual(documents["titles"], ["A", "B"])
+        self.assertEqual(documents["shards"], {"ap": "ap.json", "ba": "ba.json"})
+        self.assertEqual(self._read("ap.json"), {"apple": [0, 1]})
+        self.assertEqual(self._read("ba.json"), {"banana": [1]})
+
+    def test_incremental_update_rewrites_only_affected_shards(self):
+        self.index.update_page("a.md", "h1", "/a.html", "A", ["apple"])
+        self.index.update_page("b.md", "h2", "/b.html", "B", ["banana"])
+        self.index.write(self.dest)
+        self.index.save()
+
+        index = SearchIndex.load(self.index.path)
+        self.assertTrue(index.is_page_current("a.md", "h1"))
+        index.update_page("b.md", "h3", "/b.html", "B", ["cherry"])
+        with redirect_stdout(StringIO()):
+            self.assertEqual(index.write(self.dest), (2, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "ba.json")))
+        self.assertEqual(self._read("ch.json"), {"cherry": [1]})
+
+    def test_ids_are_stable_and_reused(self):
+        for name in ("a", "b", "c"):
+            self.index.update_page(f"{name}.md", name, f"/{name}.html", name, [name * 2])
+        self.index.write(self.dest)
+        self.index.prune_pages({"a.md", "c.md"})
+        self.index.update_page("d.md", "d", "/d.html", "d", ["dd"])
+        with redirect_stdout(StringIO()):
+            self.index.write(self.dest)
+        self.assertEqual(self._read("documents.json")["urls"], ["/a.html", "/d.html", "/c.html"])
+        self.assertEqual(self._read("cc.json"), {"cc": [2]})
+
+    def test_remove_published(self):
+        self.index.update_page("a.md", "h1", "/a.html", "A", ["apple"])
+        self.index.write(self.dest)
+        with redirect_stdout(StringIO()):
+            self.index.remove_published(self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search")))
+
+
+class TestSearchIndexGeneration(SiteGenerationTestCase):
+    BUILD_OPTIONS = {"basepath": "/repo/", "jobs": 2}
+
+    def setUp(self):
+        super().setUp()
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome to **Rivendell**.")
+        self._write(os.path.join(self.content, "blog", "tom.md"), "# Tom\n\nOld Tom Bombadil.")
+
+    def test_index_built_from_rendered_pages(self):
+        self._build()
+        index = SearchIndex(os.path.join(self.tmp.name, "search.json"))
+        # Pages the index has not seen are rendered even though the manifest has them
+        self.assertIn("Skipped 0 unchanged page(s)", self._build(search_index=index))
+        with open(os.path.join(self.dest, "search", "documents.json")) as f:
+            documents = json.load(f)
+        rivendell = documents["urls"].index("/repo/")
+        with open(os.path.join(self.dest, "search", "ri.json")) as f:
+            self.assertEqual(json.load(f), {"rivendell": [rivendell]})
+
+        self.assertIn("Skipped 2 unchanged page(s)", self._build(search_index=index))
+        self._write(os.path.join(self.content, "blog", "tom.md"), "# Tom\n\nGoldberry.")
+        output = self._build(search_index=index)
+        self.assertIn("Skipped 1 unchanged page(s)", output)
+        self.assertIn("wrote 2 file(s), 4 unchanged", output)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "bo.json")))
+        self.assertNotIn("bombadil", index.pages[os.path.join(self.content, "blog", "tom.md")]["terms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
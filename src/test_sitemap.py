@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from site_test_case import SiteGenerationTestCase
+from sitemap import SitePage, page_url, write_feed, write_sitemap
+
+# 2024-01-02T03:04:05Z
+MTIME = 1704164645
+
+
+class TestSitemap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, name):
+        with open(os.path.join(self.dest, name)) as f:
+            return f.read()
+
+    def _pages(self, count):
+        return [SitePage(f"https://x.y/p{i}.html", MTIME + i, f"Page {i}") for i in range(count)]
+
+    def test_page_url(self):
+        dest = os.path.join("docs", "blog", "a", "index.html")
+        self.assertEqual(page_url("https://x.y/", "/repo/", dest, "docs"), "https://x.y/repo/blog/a/")
+        self.assertEqual(page_url("https://x.y", "/", os.path.join("docs", "index.html"), "docs"), "https://x.y/")
+        self.assertEqual(
+            page_url("https://x.y", "/", os.path.join("docs", "a b.html"), "docs"), "https://x.y/a%20b.html"
+        )
+
+    def test_single_sitemap(self):
+        pages = [SitePage("https://x.y/?a=1&b=2", MTIME)]
+        self.assertEqual(write_sitemap(iter(pages), 1, self.dest, "https://x.y/"), ["sitemap.xml"])
+        self.assertEqual(
+            self._read("sitemap.xml"),
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            "<url><loc>https://x.y/?a=1&amp;b=2</loc><lastmod>2024-01-02</lastmod></url>\n"
+            "</urlset>\n",
+        )
+
+    def test_large_sitemap_is_split_with_an_index(self):
+        names = write_sitemap(iter(self._pages(5)), 5, self.dest, "https://x.y/", max_urls=2)
+        self.assertEqual(names, ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        self.assertIn("<sitemapindex", self._read("sitemap.xml"))
+        self.assertIn("<loc>https://x.y/sitemap-3.xml</loc>", self._read("sitemap.xml"))
+        self.assertEqual(self._read("sitemap-2.xml").count("<url>"), 2)
+        self.assertIn("https://x.y/p4.html", self._read("sitemap-3.xml"))
+
+    def test_feed_keeps_most_recent_entries(self):
+        write_feed(iter(self._pages(5)), self.dest, "https://x.y/", "Blog & Co", max_entries=2)
+        feed = self._read("feed.xml")
+        self.assertIn("<title>Blog &amp; Co</title>", feed)
+        self.assertEqual(feed.count("<entry>"), 2)
+        self.assertLess(feed.index("Page 4"), feed.index("Page 3"))
+        self.assertIn("<updated>2024-01-02T03:04:09Z</updated>\n", feed)
+        self.assertIn("<author><name>Blog &amp; Co</name></author>\n<entry>", feed)
+
+    def test_feed_author(self):
+        write_feed(iter(self._pages(1)), self.dest, "https://x.y/", "Blog", author="A <B>")
+        feed = self._read("feed.xml")
+        self.assertEqual(feed.count("<author>"), 1)
+        self.assertLess(feed.index("<author><name>A &lt;B&gt;</name></author>"), feed.index("<entry>"))
+
+
+class TestSiteIndexGeneration(SiteGenerationTestCase):
+    BUILD_OPTIONS = {"basepath": "/repo/"}
+
+    def setUp(self):
+        super().setUp()
+        self._write(os.path.join(self.content, "index.md"), "# Home")
+        self._write(os.path.join(self.content, "blog", "a", "index.md"), "# Post A")
+        self._write(os.path.join(self.content, "blog", "b", "index.md"), "# Post B")
+        os.utime(os.path.join(self.content, "blog", "b", "index.md"), (MTIME, MTIME))
+
+    def test_sitemap_and_feed_written_from_pages(self):
+        self._build(site_url="https://x.y")
+        with open(os.path.join(self.dest, "sitemap.xml")) as f:
+            sitemap = f.read()
+        self.assertEqual(sitemap.count("<url>"), 3)
+        self.assertIn("<loc>https://x.y/repo/blog/a/</loc>", sitemap)
+
+        # Titles of skipped pages come from the manifest
+        self._build(site_url="https://x.y")
+        with open(os.path.join(self.dest, "feed.xml")) as f:
+            feed = f.read()
+        self.assertIn("<title>Home</title>", feed)
+        self.assertEqual(feed.count("<entry>"), 2)
+        self.assertLess(feed.index("Post A"), feed.index("Post B"))
+        self.assertEqual(self.manifest.site_indexes, ["sitemap.xml", "feed.xml"])
+
+    def test_indexes_removed_without_site_url(self):
+        self._build(site_url="https://x.y")
+        self._build(site_url=None)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "sitemap.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "feed.xml")))
+        self.assertEqual(self.manifest.site_indexes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import compile_template, rewrite_root_urls, Template, UrlRewriter
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_splits_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.segments, ["<title>", "</title><main>", "</main>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(
+            template.render("Hello", LeafNode("p", "hi")),
+            "<title>Hello</title><p>hi</p>",
+        )
+
+    def test_repeated_and_missing_slots(self):
+        template = compile_template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render("T", LeafNode(None, "ignored")), "T|T")
+        self.assertEqual(compile_template("static").render("T", LeafNode(None, "C")), "static")
+
+    def test_unknown_placeholder_is_left_alone(self):
+        template = compile_template("{{ Author }} {{ Title }}")
+        self.assertEqual(template.render("T", LeafNode(None, "C")), "{{ Author }} T")
+
+    def test_template_urls_rewritten_at_compile_time(self):
+        template = compile_template(
+            '<link href="/index.css" />{{ Content }}', "/repo/"
+        )
+        self.assertEqual(template.segments[0], '<link href="/repo/index.css" />')
+
+    def test_content_urls_rewritten_on_render(self):
+        template = compile_template('<a href="/">home</a>{{ Content }}', "/repo/")
+        node = ParentNode("p", [
+            LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+            LeafNode("a", "x", {"href": "https://x.y/"}),
+        ])
+        self.assertEqual(
+            template.render("T", node),
+            '<a href="/repo/">home</a><p><img src="/repo/a.png" alt="a"></img><a href="https://x.y/">x</a></p>',
+        )
+
+    def test_text_that_looks_like_a_url_is_not_rewritten(self):
+        template = compile_template("{{ Content }}", "/repo/")
+        code = '<a href="/x">x</a> and src="/y"'
+        node = ParentNode("pre", [LeafNode("code", code)])
+        self.assertEqual(template.render("T", node), f"<pre><code>{code}</code></pre>")
+
+    def test_write_streams_content_node(self):
+        template = compile_template('<title>{{ Title }}</title><a href="/">h</a>{{ Content }}!', "/repo/")
+        node = ParentNode("p", [LeafNode("a", "x", {"href": "/x"})])
+        parts = []
+        template.write(parts.append, "T", node)
+        self.assertEqual(
+            "".join(parts),
+            '<title>T</title><a href="/repo/">h</a><p><a href="/repo/x">x</a></p>!',
+        )
+        self.assertEqual("".join(parts), template.render("T", node))
+
+    def test_fingerprinted_asset_urls(self):
+        assets = {"index.css": "index.0123abcd.css", "images/a.png": "images/a.4567cdef.png"}
+        template = compile_template('<link href="/index.css?v=1" />{{ Content }}', "/", assets)
+        self.assertEqual(template.segments[0], '<link href="/index.0123abcd.css?v=1" />')
+        node = ParentNode("p", [
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}),
+            LeafNode("a", "b", {"href": "/images/b.png"}),
+        ])
+        parts = []
+        template.write(parts.append, "T", node)
+        self.assertEqual(
+            "".join(parts),
+            '<link href="/index.0123abcd.css?v=1" /><p><img src="/images/a.4567cdef.png" alt="a"></img>'
+            '<a href="/images/b.png">b</a></p>',
+        )
+
+    def test_asset_urls_with_basepath_match_plain_rewrite(self):
+        html = '<a href="/">h</a><a href="/x/">x</a><img src="/y.png" alt=""></img>'
+        self.assertEqual(
+            rewrite_root_urls(html, "/repo/", {"z.css": "z.1.css"}),
+            rewrite_root_urls(html, "/repo/"),
+        )
+        self.assertEqual(
+            rewrite_root_urls('<img src="/y.png" alt=""></img>', "/repo/", {"y.png": "y.1.png"}),
+            '<img src="/repo/y.1.png" alt=""></img>',
+        )
+
+    def test_url_rewriter_memoizes(self):
+        rewrite_url = UrlRewriter("/repo/", {"a.png": "a.1.png"})
+        for _ in range(2):
+            self.assertEqual(rewrite_url("/a.png?x#y"), "/repo/a.1.png?x#y")
+            self.assertEqual(rewrite_url("https://example.com/"), "https://example.com/")
+        self.assertEqual(len(rewrite_url._cache), 2)
+
+    def test_rewrite_root_urls_default_basepath(self):
+        html = '<a href="/x">x</a>'
+        self.assertEqual(rewrite_root_urls(html, "/"), html)
+
+    def test_minified_template(self):
+        template = compile_template(
+            '<!doctype html>\n<html>\n  <!-- nav -->\n  <head>\n    <meta charset="utf-8" />\n'
+            '    <link href="/index.css" rel="stylesheet" />\n  </head>\n  <body>\n'
+            '    <article>\n      {{ Content }}\n    </article>\n  </body>\n</html>\n',
+            "/repo/", minify=True,
+        )
+        parts = []
+        saved = template.write(parts.append, "T", ParentNode("div", [LeafNode("p", "a\n b")]))
+        self.assertEqual(
+            "".join(parts),
+            "<!doctype html><html><head><meta charset=utf-8>"
+            "<link href=/repo/index.css rel=stylesheet></head><body>"
+            "<article><div><p>a b</p></div></article></body></html>",
+        )
+        self.assertEqual(saved, template.saved + 1)
+        self.assertEqual(compile_template("<p>{{ Content }}</p>").write([].append, "T", LeafNode(None, "")), 0)
+
+    def test_minified_template_keeps_pre_and_inline_spacing(self):
+        template = compile_template(
+            "<p>a <b>b</b>\n<i>c</i></p><pre>  x\n  y </pre>{{ Content }}", minify=True
+        )
+        self.assertEqual(template.segments[0], "<p>a <b>b</b> <i>c</i></p><pre>  x\n  y </pre>")
+
+    def test_invalid_template(self):
+        with self.assertRaises(ValueError):
+            Template(["a"], ["Title"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,6 +39,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Text", TextType.TEXT, "https://www.boot.dev")
         self.assertNotEqual(node, node2)
     
+    def test_no_instance_dict(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_repr(self):
         node = TextNode("Sample text", TextType.CODE, "https://example.com")
         self.assertEqual(
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import generate_pages_recursive
+from tracing import (
+    NullTracer,
+    Tracer,
+    enable_tracing,
+    format_summary,
+    get_tracer,
+    write_chrome_trace,
+)
+
+
+class TestTracer(unittest.TestCase):
+    def tearDown(self):
+        enable_tracing(False)
+
+    def test_span_records_name_page_and_duration(self):
+        tracer = Tracer()
+        with tracer.span("parse", "a.md"):
+            pass
+        (name, page, start, duration, pid, _), = tracer.spans
+        self.assertEqual((name, page, pid), ("parse", "a.md", os.getpid()))
+        self.assertGreaterEqual(duration, 0)
+
+    def test_span_recorded_on_error(self):
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("parse"):
+                raise ValueError("boom")
+        self.assertEqual(len(tracer.spans), 1)
+
+    def test_drain(self):
+        tracer = Tracer()
+        with tracer.span("x"):
+            pass
+        self.assertEqual(len(tracer.drain()), 1)
+        self.assertEqual(tracer.spans, [])
+
+    def test_null_tracer_records_nothing(self):
+        tracer = NullTracer()
+        with tracer.span("x", "a.md"):
+            pass
+        self.assertEqual(tracer.drain(), [])
+
+    def test_chrome_trace_and_summary(self):
+        spans = [
+            ("read", "a.md", 1000, 2_000_000, 1, 1),
+            ("render", "a.md", 3000, 1_000_000, 1, 1),
+            ("read", "b.md", 5000, 5_000_000, 2, 1),
+            ("sync_static", None, 0, 500_000, 1, 1),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            write_chrome_trace(spans, path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["dur"], 2000)
+        self.assertEqual(events[0]["args"], {"page": "a.md"})
+        self.assertNotIn("args", events[3])
+
+        summary = format_summary(spans)
+        self.assertIn("read", summary.splitlines()[1])
+        lines = summary.splitlines()
+        slowest = lines.index("Slowest 2 page(s):")
+        self.assertIn("b.md", lines[slowest + 1])
+        self.assertIn("a.md", lines[slowest + 2])
+
+    def test_worker_spans_are_collected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            template = os.path.join(tmp, "template.html")
+            os.makedirs(content)
+            with open(template, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            for i in range(4):
+                with open(os.path.join(content, f"p{i}.md"), "w") as f:
+                    f.write(f"# Page {i}\n\ntext")
+
+            enable_tracing()
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive(content, template, os.path.join(tmp, "out"), jobs=2)
+            spans = get_tracer().drain()
+
+        stages = {}
+        for name, page, *_ in spans:
+            if page is not None:
+                stages.setdefault(page, set()).add(name)
+        self.assertEqual(len(stages), 4)
+        for names in stages.values():
+            self.assertEqual(names, {"read", "parse_blocks", "parse_inline", "render", "write"})
+        self.assertIn("generate_pages", [span[0] for span in spans])
+
+
+if __name__ == "__main__":
+    unittest.main()
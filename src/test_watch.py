@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from build_manifest import BuildManifest, hash_file
+from main import generate_pages_recursive, rebuild_changed
+from watch import Watcher
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "content")
+        self.file = os.path.join(self.tmp.name, "template.html")
+        write(os.path.join(self.dir, "a.md"), "# A")
+        write(self.file, "{{ Content }}")
+        self.watcher = Watcher([self.dir, self.file])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), set())
+
+    def test_modified_added_and_removed(self):
+        a = os.path.join(self.dir, "a.md")
+        b = os.path.join(self.dir, "sub", "b.md")
+        bump_mtime(self.file)
+        write(b, "# B")
+        os.remove(a)
+        self.assertEqual(self.watcher.poll(), {self.file, a, b})
+        self.assertEqual(self.watcher.poll(), set())
+
+
+class TestRebuildChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        self.dest = os.path.join(root, "docs")
+        write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        self.pages = [os.path.join(self.content, name, "index.md") for name in ("a", "b")]
+        for page in self.pages:
+            write(page, "# Page")
+        self.manifest = BuildManifest(os.path.join(root, "manifest.json"))
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", self.manifest)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _rebuild(self, changed, fingerprint=False):
+        out = StringIO()
+        with redirect_stdout(out):
+            summary = rebuild_changed(
+                changed, self.content, self.static, self.template, self.dest, "/", self.manifest,
+                fingerprint=fingerprint,
+            )
+        return summary, out.getvalue()
+
+    def test_page_edit_rerenders_one_page(self):
+        write(self.pages[0], "# Edited")
+        summary, log = self._rebuild({self.pages[0]})
+        self.assertEqual(summary, "1 page(s)")
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertNotIn("Copying file", log)
+        with open(os.path.join(self.dest, "a", "index.html")) as f:
+            self.assertIn("<title>Edited</title>", f.read())
+
+    def test_page_error_does_not_stop_other_pages(self):
+        write(self.pages[0], "# Broken\n\nUnclosed **bold")
+        write(self.pages[1], "# Edited")
+        summary, log = self._rebuild({self.pages[0], self.pages[1]})
+        self.assertEqual(summary, "1 page(s), 1 failed page(s)")
+        self.assertIn(f"Error generating page {self.pages[0]}: ValueError", log)
+        with open(os.path.join(self.dest, "b", "index.html")) as f:
+            self.assertIn("<title>Edited</title>", f.read())
+        # The failed page keeps its previous output and manifest entry
+        with open(os.path.join(self.dest, "a", "index.html")) as f:
+            self.assertIn("<title>Page</title>", f.read())
+        self.assertFalse(self.manifest.is_page_current(
+            self.pages[0], hash_file(self.pages[0]), os.path.join(self.dest, "a", "index.html"),
+        ))
+
+    def test_removed_page_deletes_output(self):
+        os.remove(self.pages[1])
+        self._rebuild({self.pages[1]})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "b")))
+        self.assertNotIn(self.pages[1], self.manifest.pages)
+
+    def test_template_edit_rerenders_all_pages_only(self):
+        write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        summary, log = self._rebuild({self.template})
+        self.assertEqual(summary, "all pages")
+        self.assertEqual(log.count("Generating page"), 2)
+        self.assertNotIn("Copying file", log)
+
+    def test_static_edit_syncs_assets(self):
+        css = os.path.join(self.static, "index.css")
+        write(css, "body { margin: 0 }")
+        summary, log = self._rebuild({css})
+        self.assertEqual(summary, "1 asset(s)")
+        self.assertNotIn("Generating page", log)
+
+    def test_fingerprint_change_rerenders_all_pages(self):
+        css = os.path.join(self.static, "index.css")
+        summary, _ = self._rebuild({css}, fingerprint=True)
+        self.assertEqual(summary, "1 asset(s), all pages")
+        write(css, "body { margin: 0 }")
+        summary, _ = self._rebuild({css}, fingerprint=True)
+        self.assertEqual(summary, "1 asset(s), all pages")
+        summary, _ = self._rebuild({self.pages[0]}, fingerprint=True)
+        self.assertEqual(summary, "1 page(s)")
+
+
+if __name__ == "__main__":
+    unittest.main()
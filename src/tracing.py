@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Tracer:
+    """
+    Records timing spans as (name, page, start_ns, duration_ns, pid, tid)
+    tuples. Start times come from perf_counter_ns, which is system-wide on
+    the platforms we build on, so spans from worker processes line up.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def span(self, name, page=None):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.spans.append((
+                name, page, start, time.perf_counter_ns() - start,
+                os.getpid(), threading.get_ident(),
+            ))
+
+    def drain(self):
+        """Return the recorded spans and forget them."""
+        spans, self.spans = self.spans, []
+        return spans
+
+    def extend(self, spans):
+        self.spans.extend(spans)
+
+
+class NullTracer:
+    """A tracer that records nothing, at the cost of one shared no-op context."""
+
+    enabled = False
+    _span = nullcontext()
+
+    def span(self, name, page=None):
+        return self._span
+
+    def drain(self):
+        return []
+
+    def extend(self, spans):
+        pass
+
+
+_tracer = NullTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer(tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def enable_tracing(enabled=True):
+    """Install a fresh Tracer (or a NullTracer) for this process."""
+    set_tracer(Tracer() if enabled else NullTracer())
+
+
+def write_chrome_trace(spans, path):
+    """
+    Write spans as a Chrome trace-event JSON file, viewable in
+    chrome://tracing or Perfetto.
+    """
+    events = []
+    for name, page, start, duration, pid, tid in spans:
+        event = {
+            "name": name,
+            "cat": "page" if page is not None else "build",
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": tid,
+        }
+        if page is not None:
+            event["args"] = {"page": page}
+        events.append(event)
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def format_summary(spans, top=10):
+    """
+    Return a text table of total time per stage and the slowest pages,
+    with each page's time broken down by stage.
+    """
+    stage_totals = {}
+    stage_counts = {}
+    page_stages = {}
+    for name, page, _, duration, _, _ in spans:
+        stage_totals[name] = stage_totals.get(name, 0) + duration
+        stage_counts[name] = stage_counts.get(name, 0) + 1
+        if page is not None:
+            stages = page_stages.setdefault(page, {})
+            stages[name] = stages.get(name, 0) + duration
+
+    lines = [f"{'stage':<20}{'count':>8}{'total (ms)':>14}{'mean (ms)':>12}"]
+    for name, total in sorted(stage_totals.items(), key=lambda item: -item[1]):
+        count = stage_counts[name]
+        lines.append(f"{name:<20}{count:>8}{total / 1e6:>14.2f}{total / count / 1e6:>12.3f}")
+
+    if page_stages:
+        lines.append("")
+        lines.append(f"Slowest {min(top, len(page_stages))} page(s):")
+        slowest = sorted(page_stages.items(), key=lambda item: -sum(item[1].values()))
+        for page, stages in slowest[:top]:
+            breakdown = ", ".join(
+                f"{name} {duration / 1e6:.2f}"
+                for name, duration in sorted(stages.items(), key=lambda item: -item[1])
+            )
+            lines.append(f"  {sum(stages.values()) / 1e6:8.2f} ms  {page}  ({breakdown})")
+
+    return "\n".join(lines)
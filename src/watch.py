@@ -0,0 +1,53 @@
+import os
+
+
+def snapshot(paths):
+    """
+    Map every file under paths (files or directories) to its
+    (modification time, size).
+    """
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            _stat_into(state, path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                _stat_into(state, os.path.join(dirpath, filename))
+    return state
+
+
+def _stat_into(state, path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return
+    state[path] = (stat.st_mtime_ns, stat.st_size)
+
+
+class Watcher:
+    """
+    Polls a set of files and directories for changes.
+
+    The standard library has no portable file-change notification, so each
+    poll re-stats the watched trees and compares against the previous poll.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.state = snapshot(paths)
+
+    def poll(self):
+        """
+        Return the set of paths added, modified or removed since the last poll.
+        """
+        new_state = snapshot(self.paths)
+        changed = set()
+        for path, signature in new_state.items():
+            if self.state.get(path) != signature:
+                changed.add(path)
+        for path in self.state:
+            if path not in new_state:
+                changed.add(path)
+        self.state = new_state
+        return changed